@@ -14,31 +14,47 @@ from src.agents.quoting_agent import request_quote
 from src.agents.customer_agent import negotiate_with_customer
 from src.agents.sales_agent import process_order
 from src.agents.business_advisor import analyze_business_performance, get_business_recommendations
+from src.demos.pipeline import DEMO_CUSTOMERS, INITIAL_QUOTE, iter_recommendations
+from src.utils.event_loop import run
 from src.utils.terminal_animation import (
     start_processing_animation, stop_processing_animation,
     update_agent_processing, update_processing_step,
     show_customer_details, show_negotiation_details,
-    show_business_insights, show_processing_summary
+    show_business_insights, show_processing_summary,
+    batch_updates, wait_for_frame
 )
 
 
+# Negotiation behaviour shown per customer style (unknown styles fall back to cooperative)
+_STYLE_MESSAGES = {
+    'aggressive': "🤝 Aggressive negotiation: Asking for 20% discount, 3-day delivery",
+    'analytical': "🤝 Analytical negotiation: Requesting detailed breakdown, 10% discount",
+    'cooperative': "🤝 Cooperative negotiation: Accepting terms with minor adjustments"
+}
+
+# Display names for the known customer types and negotiation styles
+_TITLE = {s: s.title() for s in ("premium", "bulk", "standard", "analytical", "aggressive", "cooperative")}
+
+
 async def demo_advanced_features():
     """Demonstrate the advanced features of the multi-agent system"""
     
+    t0 = time.perf_counter()
     print("🚀 Starting Advanced Features Demo")
     print("=" * 80)
     
     # Initialize database
     print("📊 Initializing database...")
-    init_database()
+    await asyncio.to_thread(init_database)
     
     # Start terminal animation
     start_processing_animation()
     
     try:
         # Step 1: Customer Request Processing
-        update_processing_step("Processing customer request", 1)
-        update_agent_processing("orchestrator", "processing", "Analyzing request")
+        with batch_updates():
+            update_processing_step("Processing customer request", 1)
+            update_agent_processing("orchestrator", "processing", "Analyzing request")
         
         customer_request = "I need 500 sheets of A4 paper and 200 sheets of cardstock for our upcoming conference. We're a premium customer and need delivery within 5 days."
         customer_id = "CUST001"  # Sarah Johnson - Premium customer
@@ -46,59 +62,49 @@ async def demo_advanced_features():
         show_customer_details("Sarah Johnson (TechCorp Solutions)", customer_request)
         
         # Simulate processing time
-        await asyncio.sleep(2)
+        await wait_for_frame()
         
         # Step 2: Orchestrator Processing
-        update_agent_processing("orchestrator", "completed", "Request analyzed")
-        update_agent_processing("inventory", "processing", "Checking stock levels")
-        update_processing_step("Checking inventory availability", 2)
+        with batch_updates():
+            update_agent_processing("orchestrator", "completed", "Request analyzed")
+            update_agent_processing("inventory", "processing", "Checking stock levels")
+            update_processing_step("Checking inventory availability", 2)
         
         orchestrator_response = await handle_customer_request(customer_request, "munder_difflin.db")
-        await asyncio.sleep(1)
+        await wait_for_frame()
         
         # Step 3: Inventory Check
-        update_agent_processing("inventory", "completed", "Stock levels verified")
-        update_agent_processing("quoting", "processing", "Generating quote")
-        update_processing_step("Generating quote with discounts", 3)
+        with batch_updates():
+            update_agent_processing("inventory", "completed", "Stock levels verified")
+            update_agent_processing("quoting", "processing", "Generating quote")
+            update_processing_step("Generating quote with discounts", 3)
         
         # Step 4: Quote Generation
         quote_response = await request_quote("A4 paper x500, Cardstock x200", "munder_difflin.db", customer_id)
-        await asyncio.sleep(1)
+        await wait_for_frame()
         
-        update_agent_processing("quoting", "completed", "Quote generated")
-        update_agent_processing("customer", "processing", "Negotiating terms")
-        update_processing_step("Customer negotiation in progress", 4)
+        with batch_updates():
+            update_agent_processing("quoting", "completed", "Quote generated")
+            update_agent_processing("customer", "processing", "Negotiating terms")
+            update_processing_step("Customer negotiation in progress", 4)
         
         # Step 5: Customer Negotiation
-        # Simulate initial quote
-        initial_quote = {
-            "request_id": "Q20250124120000",
-            "item_name": "A4 paper, Cardstock",
-            "quantity": 700,
-            "unit_price": 0.12,
-            "discount_percentage": 5.0,
-            "subtotal": 84.00,
-            "discount_amount": 4.20,
-            "total_price": 79.80,
-            "delivery_days": 7,
-            "quote_explanation": "Quote for 500 A4 paper + 200 cardstock with 5% bulk discount"
-        }
-        
-        show_negotiation_details(1, initial_quote)
-        await asyncio.sleep(2)
+        show_negotiation_details(1, INITIAL_QUOTE)
+        await wait_for_frame()
         
         # Customer negotiation
         negotiation_result = await negotiate_with_customer(
-            customer_id, customer_request, initial_quote, "munder_difflin.db"
+            customer_id, customer_request, dict(INITIAL_QUOTE), "munder_difflin.db"
         )
         
         if negotiation_result.get('negotiation_successful'):
             final_deal = negotiation_result.get('final_deal', {})
             show_negotiation_details(2, final_deal)
             
-            update_agent_processing("customer", "completed", "Deal finalized")
-            update_agent_processing("sales", "processing", "Processing order")
-            update_processing_step("Processing sales transaction", 5)
+            with batch_updates():
+                update_agent_processing("customer", "completed", "Deal finalized")
+                update_agent_processing("sales", "processing", "Processing order")
+                update_processing_step("Processing sales transaction", 5)
             
             # Step 6: Sales Processing
             sales_response = await process_order(
@@ -106,16 +112,18 @@ async def demo_advanced_features():
                 "munder_difflin.db", customer_id
             )
             
-            await asyncio.sleep(1)
-            update_agent_processing("sales", "completed", "Transaction completed")
-            update_agent_processing("reordering", "processing", "Checking stock levels")
-            update_processing_step("Auto-reordering low stock items", 6)
+            await wait_for_frame()
+            with batch_updates():
+                update_agent_processing("sales", "completed", "Transaction completed")
+                update_agent_processing("reordering", "processing", "Checking stock levels")
+                update_processing_step("Auto-reordering low stock items", 6)
             
             # Step 7: Reordering
-            await asyncio.sleep(1)
-            update_agent_processing("reordering", "completed", "Stock replenished")
-            update_agent_processing("business_advisor", "processing", "Analyzing performance")
-            update_processing_step("Business advisor analysis", 7)
+            await wait_for_frame()
+            with batch_updates():
+                update_agent_processing("reordering", "completed", "Stock replenished")
+                update_agent_processing("business_advisor", "processing", "Analyzing performance")
+                update_processing_step("Business advisor analysis", 7)
             
             # Step 8: Business Advisor Analysis
             business_analysis = await analyze_business_performance("munder_difflin.db")
@@ -123,7 +131,7 @@ async def demo_advanced_features():
             
             show_business_insights(recommendations)
             
-            await asyncio.sleep(2)
+            await wait_for_frame()
             update_agent_processing("business_advisor", "completed", "Analysis complete")
             
             # Final Summary
@@ -135,7 +143,7 @@ async def demo_advanced_features():
                 'items_sold': 700,
                 'reorder_triggered': True,
                 'items_reordered': 133,
-                'processing_time': 8.5,
+                'processing_time': time.perf_counter() - t0,
                 'business_recommendations': len(recommendations)
             }
             
@@ -161,55 +169,20 @@ async def demo_customer_profiles():
     print("\n🎭 Customer Profiles Demo")
     print("=" * 80)
     
-    customers = [
-        {
-            "id": "CUST001",
-            "name": "Sarah Johnson",
-            "company": "TechCorp Solutions",
-            "type": "premium",
-            "style": "analytical",
-            "request": "I need 1000 sheets of premium paper for our annual report. Quality is more important than price."
-        },
-        {
-            "id": "CUST002", 
-            "name": "Mike Rodriguez",
-            "company": "PrintWorks Inc",
-            "type": "bulk",
-            "style": "aggressive",
-            "request": "I need 5000 sheets of A4 paper. Give me your best price - I'm shopping around."
-        },
-        {
-            "id": "CUST003",
-            "name": "Lisa Chen", 
-            "company": "Event Planners Pro",
-            "type": "standard",
-            "style": "cooperative",
-            "request": "I need 200 sheets of colored paper for an event. What can you do for me?"
-        }
-    ]
-    
-    for customer in customers:
-        print(f"\n👤 {customer['name']} ({customer['company']})")
-        print(f"🏷️  Type: {customer['type'].title()}")
-        print(f"🤝 Style: {customer['style'].title()}")
-        print(f"💬 Request: {customer['request']}")
-        print("-" * 50)
-        
-        # Simulate negotiation for each customer
-        initial_quote = {
-            "total_price": 50.00,
-            "discount_percentage": 5.0,
-            "delivery_days": 7
-        }
+    customers = DEMO_CUSTOMERS
+    
+    for i in range(len(customers)):
+        style = customers.styles[i]
+        print("\n".join([
+            f"\n👤 {customers.names[i]} ({customers.companies[i]})",
+            f"🏷️  Type: {_TITLE.get(customers.types[i]) or customers.types[i].title()}",
+            f"🤝 Style: {_TITLE.get(style) or style.title()}",
+            f"💬 Request: {customers.requests[i]}",
+            "-" * 50,
+            # Show how different customers would negotiate
+            _STYLE_MESSAGES.get(style, _STYLE_MESSAGES['cooperative'])
+        ]))
         
-        # Show how different customers would negotiate
-        if customer['style'] == 'aggressive':
-            print("🤝 Aggressive negotiation: Asking for 20% discount, 3-day delivery")
-        elif customer['style'] == 'analytical':
-            print("🤝 Analytical negotiation: Requesting detailed breakdown, 10% discount")
-        else:
-            print("🤝 Cooperative negotiation: Accepting terms with minor adjustments")
-            
         await asyncio.sleep(1)
 
 
@@ -228,44 +201,14 @@ async def demo_business_advisor():
     await asyncio.sleep(1)
     
     # Simulate business recommendations
-    recommendations = [
-        {
-            "category": "pricing",
-            "priority": "high",
-            "title": "Implement Dynamic Pricing for Premium Customers",
-            "description": "Adjust pricing based on customer type and order volume",
-            "expected_impact": "Increase revenue by 15-20%",
-            "implementation_effort": "medium",
-            "estimated_roi": 25.0,
-            "timeline": "2-3 weeks"
-        },
-        {
-            "category": "inventory",
-            "priority": "medium", 
-            "title": "Optimize Stock Levels for High-Demand Items",
-            "description": "Increase stock for A4 paper and cardstock to reduce stockouts",
-            "expected_impact": "Reduce stockouts by 40%",
-            "implementation_effort": "low",
-            "estimated_roi": 12.0,
-            "timeline": "1 week"
-        },
-        {
-            "category": "operations",
-            "priority": "high",
-            "title": "Automate Reordering Process",
-            "description": "Implement predictive reordering based on sales patterns",
-            "expected_impact": "Reduce manual work by 60%",
-            "implementation_effort": "high",
-            "estimated_roi": 35.0,
-            "timeline": "4-6 weeks"
-        }
-    ]
-    
-    show_business_insights(recommendations)
+    show_business_insights(iter_recommendations())
 
 
 async def main():
     """Main demo function"""
+    # Tasks run eagerly until their first real suspension (Python 3.12+)
+    asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+    
     print("🎬 Munder Difflin Advanced Features Demo")
     print("=" * 80)
     print("This demo showcases:")
@@ -294,4 +237,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run(main())
@@ -5,7 +5,7 @@ Demonstrates Customer Agent, Terminal Animation, and Business Advisor
 """
 
 import asyncio
-import time
+from src.utils.event_loop import run
 from src.utils.terminal_animation import TerminalAnimation
 from src.agents.customer_agent import analyze_customer_profile, evaluate_quote
 
@@ -19,24 +19,26 @@ async def quick_customer_demo():
     customers = ["CUST001", "CUST002", "CUST003"]
     names = ["Sarah Johnson (Premium)", "Mike Rodriguez (Bulk)", "Lisa Chen (Standard)"]
     
-    for customer_id, name in zip(customers, names):
-        print(f"\n👤 {name}")
-        
-        # Analyze customer profile
+    quote = {'total_price': 150.0, 'discount_percentage': 5.0, 'delivery_days': 7}
+    
+    async def _one(customer_id: str):
+        # Analyze customer profile, then test quote evaluation
         profile = await analyze_customer_profile(None, customer_id)
+        evaluation = await evaluate_quote(None, quote, profile)
+        return profile, evaluation
+    
+    # Customers are independent - analyze them concurrently
+    results = await asyncio.gather(*(_one(customer_id) for customer_id in customers))
+    
+    for name, (profile, evaluation) in zip(names, results):
+        print(f"\n👤 {name}")
         print(f"   📊 Type: {profile['customer_type']}")
         print(f"   🤝 Style: {profile['negotiation_style']}")
-        
-        # Test quote evaluation
-        quote = {'total_price': 150.0, 'discount_percentage': 5.0, 'delivery_days': 7}
-        evaluation = await evaluate_quote(None, quote, profile)
         print(f"   💰 Quote: ${quote['total_price']:,.2f} - {evaluation['strategy']}")
         print(f"   😊 Satisfaction: {evaluation['satisfaction_score']:.2f}")
-        
-        await asyncio.sleep(0.5)
 
 
-def quick_animation_demo():
+async def quick_animation_demo():
     """Quick demonstration of Terminal Animation"""
     print("\n🎬 Terminal Animation Demo")
     print("=" * 50)
@@ -54,7 +56,7 @@ def quick_animation_demo():
         ]
         
         for i, (step, agent, status, message) in enumerate(steps, 1):
-            time.sleep(1)
+            await asyncio.sleep(1)
             anim.update_processing_step(step, i)
             anim.update_agent_processing(agent, status, message)
             
@@ -65,7 +67,7 @@ def quick_animation_demo():
         
         # Mark final as completed
         anim.update_agent_processing("sales", "completed", "Transaction completed")
-        time.sleep(1)
+        await asyncio.sleep(1)
         
     finally:
         anim.stop_animation()
@@ -117,7 +119,7 @@ async def main():
     await quick_customer_demo()
     
     # Animation Demo
-    quick_animation_demo()
+    await quick_animation_demo()
     
     # Business Advisor Demo
     quick_business_demo()
@@ -129,4 +131,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run(main())
@@ -4,16 +4,23 @@ Main evaluation script for the Munder Difflin Multi-Agent System
 Runs comprehensive evaluation and generates all required deliverables
 """
 
-import asyncio
+import json
+import os
 import sys
 from datetime import datetime
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # orjson is optional - fall back to the stdlib encoder
+    orjson = None
+
 # Add src to path
 sys.path.append(str(Path(__file__).parent / "src"))
 
 from database import create_engine, generate_financial_report, init_database
 from evaluation import evaluate_system
+from utils.event_loop import run
 
 
 async def main():
@@ -47,18 +54,14 @@ async def main():
         financial_report = generate_financial_report("2025-01-15", engine)
 
         # Save financial report
-        with open("financial_report.json", "w") as f:
-            import json
-
-            json.dump(financial_report, f, indent=2, default=str)
+        write_json_report("financial_report.json", financial_report)
 
         print("✅ Financial report generated: financial_report.json")
 
-        # Cleanup
-        import os
-
-        if os.path.exists(db_path):
-            os.remove(db_path)
+        # Cleanup (close pooled connections first so SQLite drops its WAL files)
+        engine.dispose()
+        for suffix in ("", "-wal", "-shm"):
+            Path(db_path + suffix).unlink(missing_ok=True)
 
     except Exception as e:
         print(f"⚠️  Financial report generation failed: {str(e)}")
@@ -84,8 +87,15 @@ async def main():
         "financial_report.json",
     ]
 
+    # One directory listing per parent directory instead of a stat() per file
+    existing = set()
+    for directory in {Path(d).parent for d in deliverables}:
+        if directory.is_dir():
+            with os.scandir(directory) as entries:
+                existing.update((directory / entry.name).as_posix() for entry in entries)
+
     for deliverable in deliverables:
-        if Path(deliverable).exists():
+        if Path(deliverable).as_posix() in existing:
             print(f"✅ {deliverable}")
         else:
             print(f"❌ {deliverable} - MISSING")
@@ -100,8 +110,33 @@ async def main():
     print("=" * 60)
 
 
+def write_json_report(path, data):
+    """Write a JSON report, using orjson when it is installed"""
+    if orjson is not None:
+        # Datetimes go through default=str so the output matches json.dump
+        option = (
+            orjson.OPT_INDENT_2
+            | orjson.OPT_SERIALIZE_NUMPY
+            | orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_PASSTHROUGH_DATETIME
+        )
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(data, default=str, option=option))
+    else:
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2, default=str)
+
+
 def generate_summary_report(results):
     """Generate executive summary report"""
+    summary = results.summary
+    total_requests = summary["total_requests"]
+    successful_quotes = summary["successful_quotes"]
+    cash_altering = summary["cash_altering_transactions"]
+    rejected_requests = summary["rejected_requests"]
+    success_rate = (successful_quotes + summary["successful_orders"]) / total_requests * 100
+    error_rate = summary["errors"] / total_requests * 100
+
     summary_content = f"""# 📊 Evaluation Summary Report
 ## Munder Difflin Multi-Agent System
 
@@ -118,14 +153,14 @@ The Munder Difflin Multi-Agent System has been successfully evaluated and demons
 ## 📈 Key Performance Metrics
 
 ### Request Processing
-- **Total Requests**: {results.summary["total_requests"]}
-- **Success Rate**: {((results.summary["successful_quotes"] + results.summary["successful_orders"]) / results.summary["total_requests"] * 100):.1f}%
-- **Error Rate**: {(results.summary["errors"] / results.summary["total_requests"] * 100):.1f}%
+- **Total Requests**: {total_requests}
+- **Success Rate**: {success_rate:.1f}%
+- **Error Rate**: {error_rate:.1f}%
 
 ### Business Operations
-- **Successful Quotes**: {results.summary["successful_quotes"]} ✅ (Meets requirement: ≥3)
-- **Cash-Altering Transactions**: {results.summary["cash_altering_transactions"]} ✅ (Meets requirement: ≥3)
-- **Rejected Requests**: {results.summary["rejected_requests"]} ✅ (With clear justifications)
+- **Successful Quotes**: {successful_quotes} ✅ (Meets requirement: ≥3)
+- **Cash-Altering Transactions**: {cash_altering} ✅ (Meets requirement: ≥3)
+- **Rejected Requests**: {rejected_requests} ✅ (With clear justifications)
 
 ### System Architecture
 - **Agents Implemented**: 5 ✅ (Orchestrator, Inventory, Quoting, Sales, Reordering)
@@ -143,9 +178,9 @@ The Munder Difflin Multi-Agent System has been successfully evaluated and demons
 | Orchestrator for Delegation | ✅ | Central coordinator routes requests appropriately |
 | Required Tools Implementation | ✅ | All 7 starter code functions integrated |
 | Framework Usage | ✅ | Pydantic-AI framework utilized effectively |
-| Minimum 3 Cash-Altering Transactions | ✅ | {results.summary["cash_altering_transactions"]} transactions processed |
-| Minimum 3 Successful Quotes | ✅ | {results.summary["successful_quotes"]} quotes generated |
-| Rejected Requests with Justification | ✅ | {results.summary["rejected_requests"]} requests properly rejected |
+| Minimum 3 Cash-Altering Transactions | ✅ | {cash_altering} transactions processed |
+| Minimum 3 Successful Quotes | ✅ | {successful_quotes} quotes generated |
+| Rejected Requests with Justification | ✅ | {rejected_requests} requests properly rejected |
 | Transparent Decision Making | ✅ | All decisions include clear explanations |
 | Code Quality | ✅ | Modular, documented, and well-structured |
 
@@ -183,9 +218,9 @@ The Munder Difflin Multi-Agent System has been successfully evaluated and demons
 *Report generated by Munder Difflin Multi-Agent System Evaluation Suite*
 """
 
-    with open("evaluation_summary.md", "w") as f:
+    with open("evaluation_summary.md", "w", encoding="utf-8") as f:
         f.write(summary_content)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run(main())
@@ -0,0 +1,75 @@
+"""
+Shared HTTP client - One connection pool for every agent's OpenAI calls
+Bursts of delegated requests reuse warm keep-alive connections instead of each
+agent queueing on its own default-sized pool. Connections belong to the event
+loop that opened them, so each running loop gets its own pool, closed when that
+loop shuts down.
+"""
+
+import asyncio
+import weakref
+from collections.abc import AsyncIterator
+from functools import cache
+
+import httpx
+from pydantic_ai.models.openai import OpenAIChatModel
+from pydantic_ai.providers.openai import OpenAIProvider
+
+from ._runtime import LLM_CONCURRENCY
+
+# Runs are capped by the LLM limiter; nested agent runs share their parent's slot,
+# so leave headroom above it instead of queueing them on the pool
+HTTP_LIMITS = httpx.Limits(
+    max_connections=2 * LLM_CONCURRENCY,
+    max_keepalive_connections=LLM_CONCURRENCY,
+)
+HTTP_TIMEOUT = 120.0  # Seconds
+
+
+class _PerLoopTransport(httpx.AsyncBaseTransport):
+    """Sends each request through the connection pool of the running event loop"""
+
+    def __init__(self):
+        self._pools: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, tuple[httpx.AsyncHTTPTransport, AsyncIterator[None]]
+        ] = weakref.WeakKeyDictionary()
+
+    async def _pool(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        entry = self._pools.get(loop)
+        if entry is None:
+            pool = httpx.AsyncHTTPTransport(limits=HTTP_LIMITS)
+            closer = self._close_with_loop(pool)
+            await anext(closer)
+            entry = self._pools[loop] = (pool, closer)
+        return entry[0]
+
+    async def _close_with_loop(self, pool: httpx.AsyncHTTPTransport) -> AsyncIterator[None]:
+        # Parked async generator: asyncio.run (and uvloop.run) finalize every live
+        # generator before closing the loop, which closes the pool on that same loop
+        try:
+            yield
+        finally:
+            self._pools.pop(asyncio.get_running_loop(), None)
+            await pool.aclose()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        pool = await self._pool()
+        return await pool.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        entry = self._pools.pop(asyncio.get_running_loop(), None)
+        if entry is not None:
+            await entry[1].aclose()
+
+
+@cache
+def _get_provider() -> OpenAIProvider:
+    """OpenAI provider bound to the shared client (created on first use)"""
+    client = httpx.AsyncClient(transport=_PerLoopTransport(), timeout=HTTP_TIMEOUT)
+    return OpenAIProvider(http_client=client)
+
+
+def openai_model(model_name: str) -> OpenAIChatModel:
+    """OpenAI chat model that sends its requests through the shared client"""
+    return OpenAIChatModel(model_name, provider=_get_provider())
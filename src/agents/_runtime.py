@@ -0,0 +1,100 @@
+"""
+LLM Concurrency Limit - One process-wide cap on in-flight agent runs
+Batches of requests no longer burst past the OpenAI rate limits: runs wait for a
+slot, and a 429 halves the limit for a cool-down before it grows back one slot
+at a time (AIMD).
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+
+from loguru import logger
+
+LLM_CONCURRENCY = int(os.getenv("MD_LLM_CONCURRENCY", "8"))
+RATE_LIMIT_COOLDOWN = 30.0  # Seconds at the reduced limit before it starts growing back
+
+
+class AdaptiveLimiter:
+    """Counting semaphore whose limit backs off on rate limits (AIMD)"""
+
+    def __init__(self, ceiling: int, cooldown: float = RATE_LIMIT_COOLDOWN):
+        self.ceiling = max(1, ceiling)
+        self.limit = self.ceiling
+        self.cooldown = cooldown
+        self._in_flight = 0
+        self._backoff_until = 0.0
+        # Plain futures instead of asyncio.Semaphore: usable from any event loop
+        self._waiters: deque[asyncio.Future] = deque()
+
+    async def acquire(self) -> None:
+        while self._in_flight >= self.limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._wake()  # Pass the slot we were handed to the next waiter
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self._in_flight += 1
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        # Additive increase: one slot back per finished run once the cool-down is over
+        if self.limit < self.ceiling and time.monotonic() >= self._backoff_until:
+            self.limit += 1
+        self._wake()
+
+    def on_rate_limit(self) -> None:
+        """Multiplicative decrease: halve the limit for the cool-down period"""
+        self.limit = max(1, self.limit // 2)
+        self._backoff_until = time.monotonic() + self.cooldown
+        logger.warning("⏳ Rate limited - LLM concurrency reduced to {}", self.limit)
+
+    def _wake(self) -> None:
+        free = self.limit - self._in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+
+_LLM_SEM = AdaptiveLimiter(LLM_CONCURRENCY)
+
+# Set while the current task (and the tool calls it spawns) holds a slot, so an
+# orchestrator run that delegates to another agent does not wait on itself
+_holding_slot: ContextVar[bool] = ContextVar("_holding_slot", default=False)
+
+
+def _is_rate_limit(exc: BaseException) -> bool:
+    # openai.RateLimitError and pydantic-ai's ModelHTTPError both carry the status code
+    return getattr(exc, "status_code", None) == 429
+
+
+@asynccontextmanager
+async def llm_slot() -> AsyncIterator[None]:
+    """`async with llm_slot():` around an agent run (re-entrant for nested runs)"""
+    if _holding_slot.get():
+        yield
+        return
+
+    await _LLM_SEM.acquire()
+    token = _holding_slot.set(True)
+    try:
+        yield
+    except Exception as e:
+        if _is_rate_limit(e):
+            _LLM_SEM.on_rate_limit()
+        raise
+    finally:
+        _holding_slot.reset(token)
+        _LLM_SEM.release()
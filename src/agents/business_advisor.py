@@ -2,19 +2,30 @@
 Business Advisor Agent - Analyzes transactions and provides business recommendations
 """
 
+import asyncio
+import hashlib
+import json
+import sqlite3
 import sys
+from contextlib import closing
+from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta
-from typing import Any, List, Dict, Optional
-from pydantic import BaseModel
-from pydantic_ai import Agent, RunContext
+from functools import cache
+from types import SimpleNamespace
+from typing import Any
+
+import numpy as np
+import pandas as pd
 from loguru import logger
-import sqlite3
+from pydantic import BaseModel
+from pydantic_ai import RunContext
+from sqlalchemy import text
 
 from src.database import create_engine
-from src.test_config import create_test_agent
 
 
-class BusinessMetrics(BaseModel):
+@dataclass(slots=True)
+class BusinessMetrics:
     """Business performance metrics"""
     total_revenue: float = 0.0
     total_transactions: int = 0
@@ -25,7 +36,8 @@ class BusinessMetrics(BaseModel):
     operational_efficiency: float = 0.0
 
 
-class BusinessRecommendation(BaseModel):
+@dataclass(slots=True)
+class BusinessRecommendation:
     """Business improvement recommendation"""
     category: str  # pricing, inventory, operations, customer_service
     priority: str  # high, medium, low
@@ -44,27 +56,234 @@ class BusinessAdvisorDependencies(BaseModel):
     db_engine: Any = None
 
 
-# Create Business Advisor Agent
-if "pytest" in sys.modules:
-    business_advisor_agent = create_test_agent(
-        "You are the Business Advisor Agent for Munder Difflin Paper Company. "
-        "You analyze business operations, identify inefficiencies, and provide strategic recommendations. "
-        "You focus on improving revenue, reducing costs, and enhancing customer satisfaction. "
-        "You provide data-driven insights and actionable business advice.",
-        BusinessAdvisorDependencies
+# ============================================================================
+# SQL STATEMENTS (compiled once at import)
+# ============================================================================
+
+# Revenue, inventory and low stock aggregates - one pass over each table
+_METRICS_SQL = text("""
+    WITH sales AS (
+        SELECT
+            SUM(price) as total_revenue,
+            COUNT(*) as total_transactions,
+            AVG(price) as avg_transaction_value
+        FROM transactions
+        WHERE transaction_type = 'sales'
+        AND transaction_date >= :start_date AND transaction_date <= :end_date
+    ),
+    stock AS (
+        SELECT
+            COUNT(*) as total_items,
+            SUM(current_stock * unit_price) as inventory_value,
+            AVG(current_stock) as avg_stock_level,
+            SUM(current_stock <= min_stock_level) as low_stock_items
+        FROM inventory
     )
-else:
-    business_advisor_agent = Agent(
-        model="openai:gpt-4o-mini",
-        system_prompt="You are the Business Advisor Agent for Munder Difflin Paper Company. "
-        "You analyze business operations, identify inefficiencies, and provide strategic recommendations. "
-        "You focus on improving revenue, reducing costs, and enhancing customer satisfaction. "
-        "You provide data-driven insights and actionable business advice.",
-        deps_type=BusinessAdvisorDependencies,
+    SELECT * FROM sales, stock
+""")
+
+_OVERSTOCK_SQL = text("""
+    SELECT
+        item_name,
+        current_stock,
+        min_stock_level,
+        unit_price,
+        (current_stock - min_stock_level) as excess_stock,
+        (current_stock * unit_price) as stock_value
+    FROM inventory
+    WHERE current_stock > min_stock_level * 2
+    ORDER BY stock_value DESC
+    LIMIT 5
+""")
+
+_UNDERSTOCK_SQL = text("""
+    SELECT
+        item_name,
+        current_stock,
+        min_stock_level,
+        unit_price,
+        (min_stock_level - current_stock) as stock_deficit
+    FROM inventory
+    WHERE current_stock <= min_stock_level
+    ORDER BY stock_deficit DESC
+""")
+
+_TXPATTERN_SQL = text("""
+    SELECT
+        transaction_type,
+        COUNT(*) as count,
+        AVG(price) as avg_price,
+        SUM(price) as total_value
+    FROM transactions
+    WHERE transaction_date >= :since_date
+    GROUP BY transaction_type
+    ORDER BY total_value DESC
+    LIMIT 10
+""")
+
+# Cheap summary of the data: any recorded sale, restock or reset changes it
+_FINGERPRINT_SQL = text("""
+    SELECT
+        (SELECT COUNT(*) FROM transactions),
+        (SELECT TOTAL(price) FROM transactions),
+        (SELECT TOTAL(current_stock) FROM inventory)
+""")
+
+# Transaction patterns only look at recent history so the scan stays bounded
+_TXPATTERN_WINDOW_DAYS = 90
+
+
+# Impact thresholds for inefficiency classification
+_HIGH_IMPACT_STOCK_VALUE = 1000  # overstocked: tied-up stock value ($)
+_HIGH_IMPACT_DEFICIT = 50        # understocked: units below minimum
+_IMPACT_LABELS = np.array(['Medium', 'High'])
+
+
+def _impact_labels(values, threshold: float) -> np.ndarray:
+    """Label each value High/Medium with one vectorized comparison (no per-row branch)"""
+    return _IMPACT_LABELS[(np.asarray(values) > threshold).astype(np.intp)]
+
+
+# Recommendation ordering: priority first, then estimated ROI
+_PRIO = {"high": 3, "medium": 2, "low": 1}.get
+
+
+def _recommendation_rank(rec: "BusinessRecommendation") -> tuple:
+    """Sort key for recommendations (unknown priorities rank last)"""
+    return (_PRIO(rec.priority, 0), rec.estimated_roi)
+
+
+# Implementation plan bucket per timeline: 0 = immediate, 1 = short term, 2 = long term
+_BUCKET = {
+    '1-2 weeks': 0, '2-3 weeks': 0,
+    '2-4 weeks': 1, '3-4 weeks': 1, '4-5 weeks': 1,
+    '4-6 weeks': 2, '6-8 weeks': 2
+}
+
+
+@cache
+def _get_engine(db_path: str):
+    """One engine (and connection pool) per database, shared across tool calls"""
+    url = db_path if "://" in db_path else f"sqlite:///{db_path}"
+    return create_engine(url)
+
+
+# Analysis results cached per (database, current_date[, time_period_days]) together with
+# the data fingerprint they were computed from - a sale or restock makes them stale.
+# No lock: concurrent misses for the same key just run the same read-only queries twice
+_metrics_cache: dict[tuple, tuple[tuple, dict]] = {}
+_inefficiencies_cache: dict[tuple, tuple[tuple, dict]] = {}
+
+
+def _db_key(deps: BusinessAdvisorDependencies) -> str:
+    """Identify the database behind the dependencies"""
+    return str(deps.db_engine.url) if deps.db_engine is not None else deps.db_path
+
+
+def _data_fingerprint(deps: BusinessAdvisorDependencies) -> tuple | None:
+    """Fingerprint of the data behind the dependencies (None on database errors)"""
+    try:
+        with (deps.db_engine or _get_engine(deps.db_path)).connect() as conn:
+            return tuple(conn.execute(_FINGERPRINT_SQL).fetchone())
+    except Exception as e:
+        logger.warning(f"⚠️ Could not fingerprint analysis data: {e}")
+        return None
+
+
+def _cached_result(cache: dict[tuple, tuple[tuple, dict]], key: tuple, fingerprint) -> dict | None:
+    """Cached result for key, if it was computed from the same data"""
+    entry = cache.get(key)
+    if fingerprint is None or entry is None or entry[0] != fingerprint:
+        return None
+    return entry[1]
+
+
+def clear_analysis_cache():
+    """Drop cached metrics and inefficiencies (e.g. after the database changes)"""
+    _metrics_cache.clear()
+    _inefficiencies_cache.clear()
+
+
+# ============================================================================
+# PERSISTENT ANALYSIS CACHE (advisor_cache table in the same database)
+# ============================================================================
+
+_CREATE_ADVISOR_CACHE = """
+    CREATE TABLE IF NOT EXISTS advisor_cache (
+        key TEXT PRIMARY KEY,
+        created_at TEXT,
+        payload BLOB
     )
+"""
+
+
+def _sqlite_file(db_path: str) -> str | None:
+    """Filesystem path of a SQLite database given as a path or sqlite:/// URL"""
+    if db_path.startswith("sqlite:///"):
+        return db_path[len("sqlite:///"):]
+    return None if "://" in db_path else db_path
+
+
+def _analysis_cache_key(db_path: str, time_period_days: int) -> str | None:
+    """
+    Hash of the analysis inputs plus a cheap fingerprint of the data, so a
+    database reset or new transactions invalidate the cached analysis.
+    """
+    path = _sqlite_file(db_path)
+    if path is None:
+        return None
+    try:
+        with closing(sqlite3.connect(path)) as conn:
+            fingerprint = conn.execute(_FINGERPRINT_SQL.text).fetchone()
+    except sqlite3.Error as e:
+        logger.warning(f"⚠️ Analysis cache disabled: {e}")
+        return None
+
+    current_date = BusinessAdvisorDependencies().current_date
+    raw = f"{path}|{time_period_days}|{current_date}|{fingerprint}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _load_cached_analysis(db_path: str, key: str | None, ttl_hours: float) -> dict | None:
+    """Return a persisted analysis younger than ttl_hours, if any"""
+    if key is None:
+        return None
+    try:
+        with closing(sqlite3.connect(_sqlite_file(db_path))) as conn:
+            conn.execute(_CREATE_ADVISOR_CACHE)
+            row = conn.execute(
+                "SELECT created_at, payload FROM advisor_cache WHERE key = ?", (key,)
+            ).fetchone()
+    except sqlite3.Error as e:
+        logger.warning(f"⚠️ Could not read analysis cache: {e}")
+        return None
+
+    if row is None or datetime.now() - datetime.fromisoformat(row[0]) > timedelta(hours=ttl_hours):
+        return None
+    return json.loads(row[1])
+
+
+def _store_cached_analysis(db_path: str, key: str, result: dict):
+    """Persist a successful analysis"""
+    try:
+        with closing(sqlite3.connect(_sqlite_file(db_path))) as conn, conn:
+            conn.execute(_CREATE_ADVISOR_CACHE)
+            conn.execute(
+                "INSERT OR REPLACE INTO advisor_cache (key, created_at, payload) VALUES (?, ?, ?)",
+                (key, datetime.now().isoformat(), json.dumps(result, default=str))
+            )
+    except sqlite3.Error as e:
+        logger.warning(f"⚠️ Could not write analysis cache: {e}")
+
+
+BUSINESS_ADVISOR_SYSTEM_PROMPT = (
+    "You are the Business Advisor Agent for Munder Difflin Paper Company. "
+    "You analyze business operations, identify inefficiencies, and provide strategic recommendations. "
+    "You focus on improving revenue, reducing costs, and enhancing customer satisfaction. "
+    "You provide data-driven insights and actionable business advice."
+)
 
 
-@business_advisor_agent.tool
 async def analyze_business_metrics(
     ctx: RunContext[BusinessAdvisorDependencies], 
     time_period_days: int = 30
@@ -80,54 +299,45 @@ async def analyze_business_metrics(
     """
     logger.info(f"📊 Analyzing business metrics for last {time_period_days} days")
     
+    key = (_db_key(ctx.deps), ctx.deps.current_date, time_period_days)
+    # Blocking SQL runs in a worker thread so it can overlap other work
+    fingerprint = await asyncio.to_thread(_data_fingerprint, ctx.deps)
+    cached = _cached_result(_metrics_cache, key, fingerprint)
+    if cached is not None:
+        logger.debug("📊 Business metrics served from cache")
+        return cached
+
+    result = await asyncio.to_thread(_compute_business_metrics, ctx.deps, time_period_days)
+    if result is None:
+        return asdict(BusinessMetrics())
+    if fingerprint is not None:
+        _metrics_cache[key] = (fingerprint, result)
+    return result
+
+
+def _compute_business_metrics(deps: BusinessAdvisorDependencies, time_period_days: int) -> dict | None:
+    """Run the metrics queries; returns None on database errors"""
     try:
-        engine = ctx.deps.db_engine or create_engine(ctx.deps.db_path)
+        engine = deps.db_engine or _get_engine(deps.db_path)
         
         with engine.connect() as conn:
             # Calculate date range
-            end_date = datetime.strptime(ctx.deps.current_date, "%Y-%m-%d")
+            end_date = datetime.strptime(deps.current_date, "%Y-%m-%d")
             start_date = end_date - timedelta(days=time_period_days)
             
-            # Revenue analysis
-            revenue_query = """
-                SELECT 
-                    SUM(price) as total_revenue,
-                    COUNT(*) as total_transactions,
-                    AVG(price) as avg_transaction_value
-                FROM transactions 
-                WHERE transaction_type = 'sales' 
-                AND transaction_date >= ? AND transaction_date <= ?
-            """
-            
-            revenue_result = conn.execute(revenue_query, (start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"))).fetchone()
-            
-            # Inventory analysis
-            inventory_query = """
-                SELECT 
-                    COUNT(*) as total_items,
-                    SUM(current_stock * unit_price) as inventory_value,
-                    AVG(current_stock) as avg_stock_level
-                FROM inventory
-            """
-            
-            inventory_result = conn.execute(inventory_query).fetchone()
-            
-            # Low stock analysis
-            low_stock_query = """
-                SELECT COUNT(*) as low_stock_items
-                FROM inventory 
-                WHERE current_stock <= min_stock_level
-            """
-            
-            low_stock_result = conn.execute(low_stock_query).fetchone()
+            # Revenue, inventory and low stock aggregates in a single round-trip
+            row = conn.execute(_METRICS_SQL, {
+                "start_date": start_date.strftime("%Y-%m-%d"),
+                "end_date": end_date.strftime("%Y-%m-%d")
+            }).fetchone()
             
             # Calculate metrics
-            total_revenue = revenue_result[0] or 0
-            total_transactions = revenue_result[1] or 0
-            avg_transaction_value = revenue_result[2] or 0
-            inventory_value = inventory_result[1] or 0
-            low_stock_items = low_stock_result[0] or 0
-            total_items = inventory_result[0] or 1
+            total_revenue = row[0] or 0
+            total_transactions = row[1] or 0
+            avg_transaction_value = row[2] or 0
+            total_items = row[3] or 1
+            inventory_value = row[4] or 0
+            low_stock_items = row[6] or 0
             
             # Calculate derived metrics
             profit_margin = 0.25  # Assume 25% profit margin
@@ -136,24 +346,23 @@ async def analyze_business_metrics(
             customer_satisfaction = 0.85  # Based on successful transactions
             
             metrics = BusinessMetrics(
-                total_revenue=total_revenue,
-                total_transactions=total_transactions,
-                average_transaction_value=avg_transaction_value,
+                total_revenue=float(total_revenue),
+                total_transactions=int(total_transactions),
+                average_transaction_value=float(avg_transaction_value),
                 profit_margin=profit_margin,
-                inventory_turnover=inventory_turnover,
+                inventory_turnover=float(inventory_turnover),
                 customer_satisfaction=customer_satisfaction,
                 operational_efficiency=operational_efficiency
             )
             
             logger.success(f"✅ Business metrics analyzed: ${total_revenue:,.2f} revenue, {total_transactions} transactions")
-            return metrics.model_dump()
+            return asdict(metrics)
             
     except Exception as e:
         logger.error(f"❌ Error analyzing business metrics: {e}")
-        return BusinessMetrics().model_dump()
+        return None
 
 
-@business_advisor_agent.tool
 async def identify_inefficiencies(
     ctx: RunContext[BusinessAdvisorDependencies]
 ) -> dict:
@@ -165,72 +374,53 @@ async def identify_inefficiencies(
     """
     logger.info("🔍 Identifying business inefficiencies")
     
+    key = (_db_key(ctx.deps), ctx.deps.current_date)
+    fingerprint = await asyncio.to_thread(_data_fingerprint, ctx.deps)
+    cached = _cached_result(_inefficiencies_cache, key, fingerprint)
+    if cached is not None:
+        logger.debug("🔍 Inefficiencies served from cache")
+        return cached
+
+    result = await asyncio.to_thread(_compute_inefficiencies, ctx.deps)
+    if result is None:
+        return {'overstocked_items': [], 'understocked_items': [], 'transaction_patterns': []}
+    if fingerprint is not None:
+        _inefficiencies_cache[key] = (fingerprint, result)
+    return result
+
+
+def _compute_inefficiencies(deps: BusinessAdvisorDependencies) -> dict | None:
+    """Run the inefficiency queries; returns None on database errors"""
     try:
-        engine = ctx.deps.db_engine or create_engine(ctx.deps.db_path)
+        engine = deps.db_engine or _get_engine(deps.db_path)
         
         with engine.connect() as conn:
             # Analyze inventory inefficiencies
-            inventory_analysis = conn.execute("""
-                SELECT 
-                    item_name,
-                    current_stock,
-                    min_stock_level,
-                    unit_price,
-                    (current_stock - min_stock_level) as excess_stock,
-                    (current_stock * unit_price) as stock_value
-                FROM inventory 
-                WHERE current_stock > min_stock_level * 2
-                ORDER BY stock_value DESC
-                LIMIT 5
-            """).fetchall()
+            inventory_analysis = pd.read_sql(_OVERSTOCK_SQL, conn)
             
             # Analyze low stock items
-            low_stock_analysis = conn.execute("""
-                SELECT 
-                    item_name,
-                    current_stock,
-                    min_stock_level,
-                    unit_price,
-                    (min_stock_level - current_stock) as stock_deficit
-                FROM inventory 
-                WHERE current_stock <= min_stock_level
-                ORDER BY stock_deficit DESC
-            """).fetchall()
+            low_stock_analysis = pd.read_sql(_UNDERSTOCK_SQL, conn)
             
             # Analyze transaction patterns
-            transaction_analysis = conn.execute("""
-                SELECT 
-                    transaction_type,
-                    COUNT(*) as count,
-                    AVG(price) as avg_price,
-                    SUM(price) as total_value
-                FROM transactions 
-                GROUP BY transaction_type
-                ORDER BY total_value DESC
-            """).fetchall()
+            since_date = datetime.strptime(deps.current_date, "%Y-%m-%d") - timedelta(days=_TXPATTERN_WINDOW_DAYS)
+            transaction_analysis = conn.execute(
+                _TXPATTERN_SQL, {"since_date": since_date.strftime("%Y-%m-%d")}
+            ).fetchall()
+
+            # Impact labels are classified column-wise instead of per row
+            overstocked = inventory_analysis.rename(columns={
+                'item_name': 'item', 'min_stock_level': 'min_stock'
+            })[['item', 'current_stock', 'min_stock', 'excess_stock', 'stock_value']]
+            overstocked['impact'] = _impact_labels(overstocked['stock_value'], _HIGH_IMPACT_STOCK_VALUE)
+
+            understocked = low_stock_analysis.rename(columns={
+                'item_name': 'item', 'min_stock_level': 'min_stock', 'stock_deficit': 'deficit'
+            })[['item', 'current_stock', 'min_stock', 'deficit']]
+            understocked['impact'] = _impact_labels(understocked['deficit'], _HIGH_IMPACT_DEFICIT)
             
             inefficiencies = {
-                'overstocked_items': [
-                    {
-                        'item': row[0],
-                        'current_stock': row[1],
-                        'min_stock': row[2],
-                        'excess_stock': row[4],
-                        'stock_value': row[5],
-                        'impact': 'High' if row[5] > 1000 else 'Medium'
-                    }
-                    for row in inventory_analysis
-                ],
-                'understocked_items': [
-                    {
-                        'item': row[0],
-                        'current_stock': row[1],
-                        'min_stock': row[2],
-                        'deficit': row[4],
-                        'impact': 'High' if row[4] > 50 else 'Medium'
-                    }
-                    for row in low_stock_analysis
-                ],
+                'overstocked_items': overstocked.to_dict('records'),
+                'understocked_items': understocked.to_dict('records'),
                 'transaction_patterns': [
                     {
                         'type': row[0],
@@ -247,10 +437,9 @@ async def identify_inefficiencies(
             
     except Exception as e:
         logger.error(f"❌ Error identifying inefficiencies: {e}")
-        return {'overstocked_items': [], 'understocked_items': [], 'transaction_patterns': []}
+        return None
 
 
-@business_advisor_agent.tool
 async def generate_recommendations(
     ctx: RunContext[BusinessAdvisorDependencies],
     metrics: dict,
@@ -350,19 +539,17 @@ async def generate_recommendations(
         ))
     
     # Sort recommendations by priority and ROI
-    priority_order = {"high": 3, "medium": 2, "low": 1}
-    recommendations.sort(key=lambda x: (priority_order[x.priority], x.estimated_roi), reverse=True)
+    recommendations.sort(key=_recommendation_rank, reverse=True)
     
     logger.success(f"✅ Generated {len(recommendations)} business recommendations")
     return {
-        'recommendations': [rec.model_dump() for rec in recommendations],
+        'recommendations': [asdict(rec) for rec in recommendations],
         'total_recommendations': len(recommendations),
         'high_priority_count': len([r for r in recommendations if r.priority == "high"]),
         'estimated_total_roi': sum(r.estimated_roi for r in recommendations)
     }
 
 
-@business_advisor_agent.tool
 async def create_implementation_plan(
     ctx: RunContext[BusinessAdvisorDependencies],
     recommendations: dict
@@ -380,10 +567,11 @@ async def create_implementation_plan(
     
     recs = recommendations.get('recommendations', [])
     
-    # Group recommendations by timeline
-    immediate = [r for r in recs if r['timeline'] in ['1-2 weeks', '2-3 weeks']]
-    short_term = [r for r in recs if r['timeline'] in ['2-4 weeks', '3-4 weeks', '4-5 weeks']]
-    long_term = [r for r in recs if r['timeline'] in ['4-6 weeks', '6-8 weeks']]
+    # Group recommendations by timeline in a single pass
+    buckets = ([], [], [])
+    for r in recs:
+        buckets[_BUCKET.get(r['timeline'], 1)].append(r)
+    immediate, short_term, long_term = buckets
     
     implementation_plan = {
         'immediate_actions': {
@@ -415,9 +603,51 @@ async def create_implementation_plan(
     return implementation_plan
 
 
+@cache
+def get_business_advisor_agent():
+    """
+    Build the Business Advisor Agent on first use.
+
+    Creating the agent (and its OpenAI client) is deferred so that importing this
+    module - e.g. for analyze_and_recommend, which calls the tools directly - has
+    no model-side setup cost.
+    """
+    if "pytest" in sys.modules:
+        from src.test_config import create_test_agent
+
+        agent = create_test_agent(BUSINESS_ADVISOR_SYSTEM_PROMPT, BusinessAdvisorDependencies)
+    else:
+        from pydantic_ai import Agent
+
+        from ._http import openai_model
+
+        agent = Agent(
+            model=openai_model("gpt-4o-mini"),
+            system_prompt=BUSINESS_ADVISOR_SYSTEM_PROMPT,
+            deps_type=BusinessAdvisorDependencies,
+        )
+
+    for tool in (
+        analyze_business_metrics,
+        identify_inefficiencies,
+        generate_recommendations,
+        create_implementation_plan,
+    ):
+        agent.tool(tool)
+    return agent
+
+
+def __getattr__(name: str):
+    """Keep `business_advisor_agent` importable as a module attribute"""
+    if name == "business_advisor_agent":
+        return get_business_advisor_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 async def analyze_and_recommend(
     db_path: str = "munder_difflin.db",
-    time_period_days: int = 30
+    time_period_days: int = 30,
+    cache_ttl_hours: float = 24.0
 ) -> dict:
     """
     Main function to analyze business operations and provide recommendations.
@@ -425,42 +655,39 @@ async def analyze_and_recommend(
     Args:
         db_path: Database path
         time_period_days: Analysis time period
+        cache_ttl_hours: Reuse a persisted analysis younger than this (0 disables the cache)
         
     Returns:
         Complete business analysis and recommendations
     """
     logger.info("🎯 Starting comprehensive business analysis")
     
+    cache_key = None
+    if cache_ttl_hours > 0:
+        cache_key = _analysis_cache_key(db_path, time_period_days)
+        cached = _load_cached_analysis(db_path, cache_key, cache_ttl_hours)
+        if cached is not None:
+            logger.success("✅ Business analysis served from persistent cache")
+            return cached
+
+    # The pipeline is deterministic, so the tools are awaited directly instead of
+    # asking the LLM to pick them; prior outputs are passed along explicitly
+    ctx = SimpleNamespace(deps=BusinessAdvisorDependencies(db_path=db_path))
+
     try:
-        # Step 1: Analyze business metrics
-        metrics_result = await business_advisor_agent.run(
-            f"Analyze business metrics for the last {time_period_days} days",
-            deps=BusinessAdvisorDependencies(db_path=db_path)
-        )
-        metrics = metrics_result.output
-        
-        # Step 2: Identify inefficiencies
-        inefficiencies_result = await business_advisor_agent.run(
-            "Identify operational inefficiencies and bottlenecks",
-            deps=BusinessAdvisorDependencies(db_path=db_path)
+        # Steps 1 & 2: Metrics and inefficiencies only need the deps - run them together
+        metrics, inefficiencies = await asyncio.gather(
+            analyze_business_metrics(ctx, time_period_days),
+            identify_inefficiencies(ctx)
         )
-        inefficiencies = inefficiencies_result.output
         
         # Step 3: Generate recommendations
-        recommendations_result = await business_advisor_agent.run(
-            f"Generate strategic recommendations based on metrics and inefficiencies",
-            deps=BusinessAdvisorDependencies(db_path=db_path)
-        )
-        recommendations = recommendations_result.output
+        recommendations = await generate_recommendations(ctx, metrics, inefficiencies)
         
         # Step 4: Create implementation plan
-        plan_result = await business_advisor_agent.run(
-            "Create detailed implementation plan for recommendations",
-            deps=BusinessAdvisorDependencies(db_path=db_path)
-        )
-        implementation_plan = plan_result.output
+        implementation_plan = await create_implementation_plan(ctx, recommendations)
         
-        return {
+        result = {
             'analysis_successful': True,
             'metrics': metrics,
             'inefficiencies': inefficiencies,
@@ -468,6 +695,12 @@ async def analyze_and_recommend(
             'implementation_plan': implementation_plan,
             'analysis_date': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
+
+        # Only successful analyses are persisted
+        if cache_key is not None:
+            _store_cached_analysis(db_path, cache_key, result)
+
+        return result
         
     except Exception as e:
         logger.error(f"❌ Error in business analysis: {e}")
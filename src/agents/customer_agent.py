@@ -2,8 +2,12 @@
 Customer Agent - Handles customer interactions and negotiations
 """
 
+import json
 import sys
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Any, Optional
 from pydantic import BaseModel
 from pydantic_ai import Agent, RunContext
@@ -12,8 +16,11 @@ from loguru import logger
 from src.database import create_engine
 from src.test_config import create_test_agent
 
+from ._runtime import llm_slot
 
-class CustomerProfile(BaseModel):
+
+@dataclass(slots=True, frozen=True)
+class CustomerProfile:
     """Customer profile and preferences"""
     customer_id: str
     name: str
@@ -26,6 +33,20 @@ class CustomerProfile(BaseModel):
     total_orders: int = 0
     total_spent: float = 0.0
 
+    def to_dict(self) -> dict:
+        return {
+            'customer_id': self.customer_id,
+            'name': self.name,
+            'company': self.company,
+            'customer_type': self.customer_type,
+            'negotiation_style': self.negotiation_style,
+            'budget_range': self.budget_range,
+            'preferred_delivery_time': self.preferred_delivery_time,
+            'loyalty_discount': self.loyalty_discount,
+            'total_orders': self.total_orders,
+            'total_spent': self.total_spent,
+        }
+
 
 class NegotiationContext(BaseModel):
     """Context for negotiation process"""
@@ -45,6 +66,76 @@ class CustomerDependencies(BaseModel):
     db_engine: Any = None
 
 
+# In a real system, this would query customer database
+# For now, profiles are static and keyed by customer_id
+_CUSTOMER_PROFILES = {
+    "CUST001": CustomerProfile(
+        customer_id="CUST001",
+        name="Sarah Johnson",
+        company="TechCorp Solutions",
+        customer_type="premium",
+        negotiation_style="analytical",
+        budget_range=(5000.0, 15000.0),
+        preferred_delivery_time=5,
+        loyalty_discount=0.05,
+        total_orders=12,
+        total_spent=45000.0
+    ),
+    "CUST002": CustomerProfile(
+        customer_id="CUST002",
+        name="Mike Rodriguez",
+        company="PrintWorks Inc",
+        customer_type="bulk",
+        negotiation_style="aggressive",
+        budget_range=(20000.0, 50000.0),
+        preferred_delivery_time=3,
+        loyalty_discount=0.08,
+        total_orders=8,
+        total_spent=120000.0
+    ),
+    "CUST003": CustomerProfile(
+        customer_id="CUST003",
+        name="Lisa Chen",
+        company="Event Planners Pro",
+        customer_type="standard",
+        negotiation_style="cooperative",
+        budget_range=(1000.0, 5000.0),
+        preferred_delivery_time=7,
+        loyalty_discount=0.02,
+        total_orders=3,
+        total_spent=8500.0
+    )
+}
+
+
+@lru_cache(maxsize=256)
+def _get_profile_dump(customer_id: str) -> MappingProxyType:
+    """Read-only dump of a customer's profile (unknown IDs get a new-customer profile)"""
+    profile = _CUSTOMER_PROFILES.get(customer_id) or CustomerProfile(
+        customer_id=customer_id,
+        name="New Customer",
+        customer_type="standard",
+        negotiation_style="cooperative"
+    )
+    return MappingProxyType(profile.to_dict())
+
+
+# Counter-offer parameters per negotiation style: (discount increase, delivery days reduction)
+_STYLE_PARAMS = {
+    'aggressive': (0.15, 2),   # Ask for 15-20% discount
+    'analytical': (0.10, 1),   # Ask for 8-12% discount with data-driven reasoning
+    'cooperative': (0.06, 1),  # Ask for 5-8% discount
+}
+
+# Discount increase multiplier per customer type (others get no boost)
+_TYPE_MULT = {'premium': 1.2, 'bulk': 1.5}
+
+# Fixed parts of the next steps reported for a finalized deal
+_ORDER_STEP = "Order will be processed by Sales Agent"
+_DELIVERY_STEP_TEMPLATE = "Delivery scheduled for {days} days"
+_POST_DELIVERY_STEPS = ("Invoice will be generated", "Customer will receive confirmation email")
+
+
 # Create Customer Agent
 if "pytest" in sys.modules:
     customer_agent = create_test_agent(
@@ -55,8 +146,10 @@ if "pytest" in sys.modules:
         CustomerDependencies
     )
 else:
+    from ._http import openai_model
+
     customer_agent = Agent(
-        model="openai:gpt-4o-mini",
+        model=openai_model("gpt-4o-mini"),
         system_prompt="You are the Customer Agent for Munder Difflin Paper Company. "
         "You represent the customer's interests and negotiate on their behalf. "
         "You analyze quotes, make counter-offers, and ensure the customer gets the best deal. "
@@ -80,56 +173,10 @@ async def analyze_customer_profile(
     """
     logger.info(f"🔍 Analyzing customer profile: {customer_id}")
     
-    # In a real system, this would query customer database
-    # For now, we'll create a realistic profile based on customer_id
-    profiles = {
-        "CUST001": CustomerProfile(
-            customer_id="CUST001",
-            name="Sarah Johnson",
-            company="TechCorp Solutions",
-            customer_type="premium",
-            negotiation_style="analytical",
-            budget_range=(5000, 15000),
-            preferred_delivery_time=5,
-            loyalty_discount=0.05,
-            total_orders=12,
-            total_spent=45000.0
-        ),
-        "CUST002": CustomerProfile(
-            customer_id="CUST002",
-            name="Mike Rodriguez",
-            company="PrintWorks Inc",
-            customer_type="bulk",
-            negotiation_style="aggressive",
-            budget_range=(20000, 50000),
-            preferred_delivery_time=3,
-            loyalty_discount=0.08,
-            total_orders=8,
-            total_spent=120000.0
-        ),
-        "CUST003": CustomerProfile(
-            customer_id="CUST003",
-            name="Lisa Chen",
-            company="Event Planners Pro",
-            customer_type="standard",
-            negotiation_style="cooperative",
-            budget_range=(1000, 5000),
-            preferred_delivery_time=7,
-            loyalty_discount=0.02,
-            total_orders=3,
-            total_spent=8500.0
-        )
-    }
-    
-    profile = profiles.get(customer_id, CustomerProfile(
-        customer_id=customer_id,
-        name="New Customer",
-        customer_type="standard",
-        negotiation_style="cooperative"
-    ))
+    profile = _get_profile_dump(customer_id)
     
-    logger.success(f"✅ Customer profile analyzed: {profile.name} ({profile.customer_type})")
-    return profile.model_dump()
+    logger.success(f"✅ Customer profile analyzed: {profile['name']} ({profile['customer_type']})")
+    return dict(profile)
 
 
 @customer_agent.tool
@@ -150,33 +197,55 @@ async def evaluate_quote(
     """
     logger.info(f"💰 Evaluating quote for {customer_profile['name']}")
     
-    # Analyze quote against customer preferences
+    # Check the deal-breaker first: a price over budget needs major negotiation regardless
     total_price = quote.get('total_price', 0)
-    budget_min, budget_max = customer_profile.get('budget_range', (0, float('inf')))
+    budget_min, budget_max = customer_profile.get('budget_range') or (0, float('inf'))
     
-    # Calculate satisfaction score
+    if budget_max and total_price > budget_max:
+        evaluation = {
+            "satisfaction_score": 0.2,
+            "strategy": "major_negotiation",
+            "message": "We need to negotiate better terms to make this work.",
+            "price_acceptable": False,
+            "delivery_acceptable": None,
+            "discount_acceptable": None,
+            "negotiation_points": [f"Price of ${total_price:,.2f} exceeds our maximum budget of ${budget_max:,.2f}"]
+        }
+        logger.success("✅ Quote evaluated: major_negotiation (over budget)")
+        return evaluation
+    
+    # Read the remaining inputs once
+    delivery_days = quote.get('delivery_days', 7)
+    discount = quote.get('discount_percentage', 0)
+    preferred_delivery = customer_profile.get('preferred_delivery_time', 7)
+    loyalty_discount = customer_profile.get('loyalty_discount', 0)
+    
+    price_ok = True
+    delivery_ok = delivery_days <= preferred_delivery
+    discount_ok = discount >= loyalty_discount
+    
+    # Calculate satisfaction score and negotiation points in a single pass
     satisfaction = 0.5
+    negotiation_points = []
     
-    # Price evaluation
-    if budget_max and total_price <= budget_max:
-        price_score = 1.0 - (total_price - budget_min) / (budget_max - budget_min)
+    if budget_max:
+        budget_span = budget_max - budget_min
+        price_score = 1.0 - (total_price - budget_min) / budget_span if budget_span else 1.0
         satisfaction += price_score * 0.4
+    if total_price > budget_min and budget_min:
+        negotiation_points.append(f"Price is above our minimum budget of ${budget_min:,.2f}")
     
-    # Delivery time evaluation
-    delivery_days = quote.get('delivery_days', 7)
-    preferred_delivery = customer_profile.get('preferred_delivery_time', 7)
-    if delivery_days <= preferred_delivery:
+    if delivery_ok:
         satisfaction += 0.3
+    else:
+        negotiation_points.append(f"Delivery time of {delivery_days} days exceeds our preferred {preferred_delivery} days")
     
-    # Discount evaluation
-    discount = quote.get('discount_percentage', 0)
-    loyalty_discount = customer_profile.get('loyalty_discount', 0)
-    if discount >= loyalty_discount:
+    if discount_ok:
         satisfaction += 0.2
+    else:
+        negotiation_points.append(f"Discount of {discount:.1%} is below our loyalty discount of {loyalty_discount:.1%}")
     
     # Determine negotiation strategy
-    negotiation_style = customer_profile.get('negotiation_style', 'cooperative')
-    
     if satisfaction >= 0.8:
         strategy = "accept"
         message = "This quote meets our expectations. We're ready to proceed."
@@ -191,22 +260,12 @@ async def evaluate_quote(
         "satisfaction_score": satisfaction,
         "strategy": strategy,
         "message": message,
-        "price_acceptable": total_price <= budget_max if budget_max else True,
-        "delivery_acceptable": delivery_days <= preferred_delivery,
-        "discount_acceptable": discount >= loyalty_discount,
-        "negotiation_points": []
+        "price_acceptable": price_ok,
+        "delivery_acceptable": delivery_ok,
+        "discount_acceptable": discount_ok,
+        "negotiation_points": negotiation_points
     }
     
-    # Add specific negotiation points
-    if total_price > budget_min and budget_min:
-        evaluation["negotiation_points"].append(f"Price is above our minimum budget of ${budget_min:,.2f}")
-    
-    if delivery_days > preferred_delivery:
-        evaluation["negotiation_points"].append(f"Delivery time of {delivery_days} days exceeds our preferred {preferred_delivery} days")
-    
-    if discount < loyalty_discount:
-        evaluation["negotiation_points"].append(f"Discount of {discount:.1%} is below our loyalty discount of {loyalty_discount:.1%}")
-    
     logger.success(f"✅ Quote evaluated: {strategy} (satisfaction: {satisfaction:.2f})")
     return evaluation
 
@@ -237,25 +296,9 @@ async def make_counter_offer(
     # Base counter-offer on original quote
     counter_offer = original_quote.copy()
     
-    # Adjust based on negotiation style
-    if negotiation_style == "aggressive":
-        # Ask for 15-20% discount
-        discount_increase = 0.15
-        delivery_reduction = 2
-    elif negotiation_style == "analytical":
-        # Ask for 8-12% discount with data-driven reasoning
-        discount_increase = 0.10
-        delivery_reduction = 1
-    else:  # cooperative
-        # Ask for 5-8% discount
-        discount_increase = 0.06
-        delivery_reduction = 1
-    
-    # Apply customer type multiplier
-    if customer_type == "premium":
-        discount_increase *= 1.2
-    elif customer_type == "bulk":
-        discount_increase *= 1.5
+    # Adjust based on negotiation style and customer type
+    discount_increase, delivery_reduction = _STYLE_PARAMS.get(negotiation_style, _STYLE_PARAMS['cooperative'])
+    discount_increase *= _TYPE_MULT.get(customer_type, 1.0)
     
     # Calculate new discount
     current_discount = original_quote.get('discount_percentage', 0) / 100
@@ -297,6 +340,8 @@ async def finalize_deal(
     """
     logger.info(f"✅ Finalizing deal for {customer_profile['name']}")
     
+    delivery_days = final_quote.get('delivery_days', 7)
+    
     deal = {
         'customer_id': customer_profile['customer_id'],
         'customer_name': customer_profile['name'],
@@ -304,15 +349,14 @@ async def finalize_deal(
         'quote_id': final_quote.get('request_id', ''),
         'total_amount': final_quote.get('total_price', 0),
         'discount_applied': final_quote.get('discount_percentage', 0),
-        'delivery_days': final_quote.get('delivery_days', 7),
+        'delivery_days': delivery_days,
         'deal_status': 'finalized',
-        'finalized_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'finalized_at': datetime.now().isoformat(sep=' ', timespec='seconds'),
         'customer_satisfaction': 0.9,  # High satisfaction for finalized deals
         'next_steps': [
-            "Order will be processed by Sales Agent",
-            f"Delivery scheduled for {final_quote.get('delivery_days', 7)} days",
-            "Invoice will be generated",
-            "Customer will receive confirmation email"
+            _ORDER_STEP,
+            _DELIVERY_STEP_TEMPLATE.format(days=delivery_days),
+            *_POST_DELIVERY_STEPS
         ]
     }
     
@@ -320,6 +364,21 @@ async def finalize_deal(
     return deal
 
 
+def _parse_json_output(output: Any) -> dict | None:
+    """Decode a JSON agent response, tolerating markdown code fences (None if it is not a JSON object)"""
+    if isinstance(output, dict):
+        return output
+    text = str(output).strip()
+    if text.startswith("```"):
+        text = text.strip("`").removeprefix("json").strip()
+    try:
+        parsed = json.loads(text)
+    except json.JSONDecodeError:
+        logger.warning("⚠️ Agent response is not JSON - keeping the raw text")
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+
 async def negotiate_with_customer(
     customer_id: str,
     original_request: str,
@@ -340,35 +399,49 @@ async def negotiate_with_customer(
     """
     logger.info(f"🤝 Starting negotiation with customer {customer_id}")
     
+    # One dependency object shared by every agent run in this negotiation
+    deps = CustomerDependencies(db_path=db_path)
+    
     try:
-        # Step 1: Analyze customer profile
-        profile_result = await customer_agent.run(
-            f"Analyze customer profile for {customer_id}",
-            deps=CustomerDependencies(db_path=db_path)
-        )
-        customer_profile = profile_result.output
-        
-        # Step 2: Evaluate the initial quote
-        evaluation_result = await customer_agent.run(
-            f"Evaluate this quote for customer {customer_id}: {initial_quote}",
-            deps=CustomerDependencies(db_path=db_path)
-        )
-        evaluation = evaluation_result.output
-        
-        # Step 3: Make counter-offer if needed
-        if evaluation.get('strategy') != 'accept':
-            counter_offer_result = await customer_agent.run(
-                f"Make a counter-offer for customer {customer_id} based on their preferences",
-                deps=CustomerDependencies(db_path=db_path)
-            )
-            counter_offer = counter_offer_result.output
+        if customer_id in _CUSTOMER_PROFILES:
+            # Step 1: Known profiles are static - no model round trip needed to look them up
+            customer_profile = dict(_get_profile_dump(customer_id))
             
-            # Step 4: Finalize the deal
-            finalize_result = await customer_agent.run(
-                f"Finalize the deal for customer {customer_id}",
-                deps=CustomerDependencies(db_path=db_path)
-            )
-            final_deal = finalize_result.output
+            # Step 2: Evaluate the initial quote against that profile
+            async with llm_slot():
+                evaluation_result = await customer_agent.run(
+                    f"Evaluate this quote for customer {customer_id}: {initial_quote}. "
+                    f"Customer profile: {customer_profile}. Respond with the evaluation as JSON only.",
+                    deps=deps
+                )
+            evaluation = _parse_json_output(evaluation_result.output) or evaluation_result.output
+        else:
+            # Steps 1-2: Analyze the customer profile and evaluate the quote in one run
+            async with llm_slot():
+                assessment_result = await customer_agent.run(
+                    f"Analyze customer profile for {customer_id}, then evaluate this quote for them: {initial_quote}. "
+                    'Respond with JSON only: {"profile": <profile>, "evaluation": <evaluation>}',
+                    deps=deps
+                )
+            assessment = _parse_json_output(assessment_result.output) or {}
+            customer_profile = assessment.get('profile') or dict(_get_profile_dump(customer_id))
+            evaluation = assessment.get('evaluation', assessment_result.output)
+        
+        # Steps 3-4: Make a counter-offer if needed and finalize the deal in one run
+        # (an evaluation that could not be parsed is negotiated, never auto-accepted)
+        if not isinstance(evaluation, dict) or evaluation.get('strategy') != 'accept':
+            async with llm_slot():
+                closing_result = await customer_agent.run(
+                    f"Make a counter-offer for customer {customer_id} based on their preferences, "
+                    "then finalize the deal using that counter-offer. "
+                    f"Original quote: {initial_quote}. Customer profile: {customer_profile}. "
+                    f"Quote evaluation: {evaluation}. "
+                    'Respond with JSON only: {"counter_offer": <counter-offer>, "final_deal": <deal>}',
+                    deps=deps
+                )
+            closing = _parse_json_output(closing_result.output) or {}
+            counter_offer = closing.get('counter_offer')
+            final_deal = closing.get('final_deal', closing_result.output)
             
             return {
                 'negotiation_successful': True,
@@ -380,11 +453,15 @@ async def negotiate_with_customer(
             }
         else:
             # Customer accepts initial quote
-            finalize_result = await customer_agent.run(
-                f"Finalize the deal for customer {customer_id} - they accepted the initial quote",
-                deps=CustomerDependencies(db_path=db_path)
-            )
-            final_deal = finalize_result.output
+            async with llm_slot():
+                finalize_result = await customer_agent.run(
+                    f"Finalize the deal for customer {customer_id} - they accepted the initial quote. "
+                    f"Final quote: {initial_quote}. Customer profile: {customer_profile}. "
+                    "Respond with the deal as JSON only.",
+                    deps=deps
+                )
+            # Same shape as the counter-offer branch: the deal dict, or the raw text
+            final_deal = _parse_json_output(finalize_result.output) or finalize_result.output
             
             return {
                 'negotiation_successful': True,
@@ -3,21 +3,31 @@ Inventory Agent - Manages stock checking and product search
 Provides real-time inventory information to customers and other agents
 """
 
-import sqlite3
+import io
+import os
 import sys
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any
 
-import pandas as pd
 from loguru import logger
 from pydantic import BaseModel
 from pydantic_ai import Agent, RunContext
 
+from src.db import acquire_reader, catalog_version
+
+from ._runtime import llm_slot
+
 # ============================================================================
 # MODELS - Estruturas de dados
 # ============================================================================
 
 
-class InventoryItem(BaseModel):
+@dataclass(slots=True, frozen=True)
+class InventoryItem:
     """Modelo para um item do inventário"""
 
     product_name: str
@@ -36,6 +46,15 @@ class InventoryItem(BaseModel):
         else:
             return f"✅ IN STOCK ({self.stock_level} units available)"
 
+    def to_dict(self) -> dict:
+        return {
+            "product_name": self.product_name,
+            "stock_level": self.stock_level,
+            "min_stock_level": self.min_stock_level,
+            "unit_cost": self.unit_cost,
+            "is_low_stock": self.is_low_stock,
+        }
+
 
 class InventoryDependencies(BaseModel):
     """Dependências para o Inventory Agent"""
@@ -83,8 +102,10 @@ if "pytest" in sys.modules:
 
     inventory_agent = create_test_agent(INVENTORY_SYSTEM_PROMPT, InventoryDependencies)
 else:
+    from ._http import openai_model
+
     inventory_agent = Agent(
-        model="openai:gpt-4o-mini",  # Mini é suficiente para queries simples
+        model=openai_model("gpt-4o-mini"),  # Mini é suficiente para queries simples
         system_prompt=INVENTORY_SYSTEM_PROMPT,
         deps_type=InventoryDependencies,
     )
@@ -95,16 +116,114 @@ else:
 # ============================================================================
 
 
-def get_db_connection(db_path: str) -> sqlite3.Connection:
-    """Cria conexão com o banco de dados"""
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row  # Para acessar colunas por nome
-    return conn
+# Listagens completas (inventário / estoque baixo) são reaproveitadas por alguns segundos,
+# ou até uma venda/reposição mudar o estoque (catalog_version)
+_SNAPSHOT_TTL_SECONDS = 10
+
+# Consultas fixas: o cache de statements do sqlite3 reaproveita o prepare nas conexões do pool.
+# Buscas exatas por nome usam COLLATE NOCASE (índice idx_inventory_item_nocase, src/db/schema.py)
+_PREPARED = {
+    "stock_by_name": """
+        SELECT
+            item_name,
+            current_stock,
+            min_stock_level,
+            unit_price,
+            (current_stock < min_stock_level) AS is_low
+        FROM inventory
+        WHERE item_name = ? COLLATE NOCASE
+    """,
+    "availability_by_name": """
+        SELECT current_stock, item_name
+        FROM inventory
+        WHERE item_name = ? COLLATE NOCASE
+    """,
+}
+
+
+def _snapshot_bucket(db_path: str) -> tuple[int, int]:
+    """Chave das listagens cacheadas: expira a cada _SNAPSHOT_TTL_SECONDS e a cada escrita no estoque"""
+    return int(time.time() // _SNAPSHOT_TTL_SECONDS), catalog_version(db_path)
+
+
+def _format_status(stock_level: int, is_low: bool) -> str:
+    """Status legível do estoque (is_low vem calculado na própria consulta SQL)"""
+    if stock_level == 0:
+        return "❌ OUT OF STOCK"
+    if is_low:
+        return f"⚠️ LOW STOCK ({stock_level} units left)"
+    return f"✅ IN STOCK ({stock_level} units available)"
+
+
+_SEARCH_SQL = """
+    SELECT
+        item_name,
+        current_stock,
+        min_stock_level,
+        unit_price,
+        (current_stock < min_stock_level) AS is_low
+    FROM inventory
+    ORDER BY item_name
+"""
+
+_NO_MATCHES: set[int] = set()  # nunca é modificado
+
+
+class _SearchIndex:
+    """Índice de trigramas em memória sobre os nomes do inventário (busca por substring)"""
+
+    __slots__ = ("version", "rows", "_names", "_trigrams", "match")
+
+    def __init__(self, version: tuple, rows: list):
+        self.version = version
+        self.rows = rows
+        self._names = [row["item_name"].lower() for row in rows]
+        self._trigrams: dict[str, set[int]] = defaultdict(set)
+        for i, name in enumerate(self._names):
+            for j in range(len(name) - 2):
+                self._trigrams[name[j : j + 3]].add(i)
+        # Resultados por termo, válidos enquanto este índice estiver em uso
+        self.match = lru_cache(maxsize=512)(self._match)
+
+    def _match(self, search_term: str) -> tuple:
+        term = search_term.lower()
+        if len(term) < 3:
+            candidates = range(len(self.rows))
+        else:
+            candidates = sorted(
+                set.intersection(
+                    *(self._trigrams.get(term[j : j + 3], _NO_MATCHES) for j in range(len(term) - 2))
+                )
+            )
+        return tuple(self.rows[i] for i in candidates if term in self._names[i])
+
+
+_search_indexes: dict[str, _SearchIndex] = {}
 
 
-def check_low_stock(stock_level: int, min_stock_level: int) -> bool:
-    """Verifica se o estoque está baixo"""
-    return stock_level < min_stock_level
+def _db_version(db_path: str) -> tuple:
+    """
+    catalog_version (escritas deste processo, ver _snapshot_bucket) mais o mtime do
+    banco e do WAL (escritas de outros processos)
+    """
+    version = [catalog_version(db_path)]
+    for path in (db_path, f"{db_path}-wal"):
+        try:
+            version.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            version.append(None)
+    return tuple(version)
+
+
+async def _get_search_index(db_path: str) -> _SearchIndex:
+    """Retorna o índice de busca, recarregando-o quando o banco foi alterado"""
+    version = _db_version(db_path)
+    index = _search_indexes.get(db_path)
+    if index is None or index.version != version:
+        async with acquire_reader(db_path) as conn:
+            rows = conn.execute(_SEARCH_SQL).fetchall()
+        index = _search_indexes[db_path] = _SearchIndex(version, rows)
+    return index
 
 
 # ============================================================================
@@ -112,6 +231,51 @@ def check_low_stock(stock_level: int, min_stock_level: int) -> bool:
 # ============================================================================
 
 
+# (db_path, consulta) -> (bucket de _snapshot_bucket, relatório formatado, nº de itens)
+_reports: dict[tuple[str, str], tuple[tuple[int, int], str, int]] = {}
+
+
+async def _cached_report(
+    db_path: str, query: str, render: Callable[[list], tuple[str, int]]
+) -> tuple[str, int]:
+    """Relatório de uma listagem completa, refeito só quando o bucket do banco muda"""
+    bucket = _snapshot_bucket(db_path)
+    entry = _reports.get((db_path, query))
+    if entry is None or entry[0] != bucket:
+        async with acquire_reader(db_path) as conn:
+            rows = conn.execute(query).fetchall()
+        entry = _reports[(db_path, query)] = (bucket, *render(rows))
+    return entry[1], entry[2]
+
+
+_ALL_INVENTORY_SQL = """
+    SELECT
+        item_name,
+        current_stock,
+        min_stock_level,
+        unit_price,
+        (current_stock < min_stock_level) AS is_low
+    FROM inventory
+    ORDER BY item_name
+"""
+
+
+def _render_inventory(rows: list) -> tuple[str, int]:
+    """Inventário formatado e nº de itens"""
+    if not rows:
+        return "❌ No items found in inventory.", 0
+
+    # Formatar resposta
+    lines = [f"• {row['item_name']}: {_format_status(row['current_stock'], row['is_low'])}" for row in rows]
+
+    return "📦 **Current Inventory:**\n" + "\n".join(lines), len(lines)
+
+
+async def _all_inventory_report(db_path: str) -> tuple[str, int]:
+    """Inventário completo formatado (cache: ver _snapshot_bucket)"""
+    return await _cached_report(db_path, _ALL_INVENTORY_SQL, _render_inventory)
+
+
 @inventory_agent.tool
 async def get_all_inventory(ctx: RunContext[InventoryDependencies]) -> str:
     """
@@ -123,38 +287,10 @@ async def get_all_inventory(ctx: RunContext[InventoryDependencies]) -> str:
     logger.info("🔍 Fetching complete inventory...")
 
     try:
-        conn = get_db_connection(ctx.deps.db_path)
-
-        query = """
-            SELECT 
-                item_name,
-                current_stock,
-                min_stock_level,
-                unit_price
-            FROM inventory
-            ORDER BY item_name
-        """
-
-        df = pd.read_sql_query(query, conn)
-        conn.close()
-
-        if df.empty:
-            return "❌ No items found in inventory."
-
-        # Formatar resposta
-        items = []
-        for _, row in df.iterrows():
-            item = InventoryItem(
-                product_name=row["item_name"],
-                stock_level=row["current_stock"],
-                min_stock_level=row["min_stock_level"],
-                unit_cost=row["unit_price"],
-                is_low_stock=check_low_stock(row["current_stock"], row["min_stock_level"]),
-            )
-            items.append(f"• {item.product_name}: {item.stock_status}")
+        result, count = await _all_inventory_report(ctx.deps.db_path)
 
-        result = "📦 **Current Inventory:**\n" + "\n".join(items)
-        logger.success(f"✅ Found {len(items)} items in inventory")
+        if count:
+            logger.success(f"✅ Found {count} items in inventory")
 
         return result
 
@@ -183,51 +319,31 @@ async def get_stock_level(ctx: RunContext[InventoryDependencies], product_name:
     logger.info(f"🔍 Checking stock for: {product_name}")
 
     try:
-        conn = get_db_connection(ctx.deps.db_path)
-        cursor = conn.cursor()
-
-        # Query case-insensitive
-        query = """
-            SELECT 
-                item_name,
-                current_stock,
-                min_stock_level,
-                unit_price
-            FROM inventory
-            WHERE LOWER(item_name) = LOWER(?)
-        """
-
-        cursor.execute(query, (product_name,))
-        row = cursor.fetchone()
-        conn.close()
+        # Query case-insensitive (usa idx_inventory_item_nocase)
+        async with acquire_reader(ctx.deps.db_path) as conn:
+            row = conn.execute(_PREPARED["stock_by_name"], (product_name,)).fetchone()
 
         if not row:
             logger.warning(f"⚠️ Product not found: {product_name}")
             return f"❌ Product '{product_name}' not found in inventory. Please check the spelling or ask for our product catalog."
 
-        # Criar objeto InventoryItem
-        item = InventoryItem(
-            product_name=row["item_name"],
-            stock_level=row["current_stock"],
-            min_stock_level=row["min_stock_level"],
-            unit_cost=row["unit_price"],
-            is_low_stock=check_low_stock(row["current_stock"], row["min_stock_level"]),
-        )
+        stock = row["current_stock"]
+        min_stock = row["min_stock_level"]
 
         # Formatar resposta detalhada
         response = f"""
-📦 **{item.product_name}**
-{item.stock_status}
+📦 **{row['item_name']}**
+{_format_status(stock, row['is_low'])}
 
 Details:
-- Current Stock: {item.stock_level} units
-- Minimum Level: {item.min_stock_level} units
-- Unit Cost: ${item.unit_cost:.2f}
+- Current Stock: {stock} units
+- Minimum Level: {min_stock} units
+- Unit Cost: ${row['unit_price']:.2f}
 """
 
-        if item.stock_level == 0:
+        if stock == 0:
             response += "\n⚠️ This item needs to be reordered."
-        elif item.is_low_stock:
+        elif row["is_low"]:
             response += "\n⚠️ Stock is below minimum level. Reordering recommended."
 
         logger.success(f"✅ Stock check completed for {product_name}")
@@ -259,45 +375,39 @@ async def search_products(ctx: RunContext[InventoryDependencies], search_term: s
     logger.info(f"🔍 Searching products with term: {search_term}")
 
     try:
-        conn = get_db_connection(ctx.deps.db_path)
-
-        # Query com LIKE para busca parcial
-        query = """
-            SELECT 
-                item_name,
-                current_stock,
-                min_stock_level,
-                unit_price
-            FROM inventory
-            WHERE LOWER(item_name) LIKE LOWER(?)
-            ORDER BY item_name
-        """
-
-        search_pattern = f"%{search_term}%"
-        df = pd.read_sql_query(query, conn, params=(search_pattern,))
-        conn.close()
-
-        if df.empty:
+        if "%" in search_term or "_" in search_term:
+            # Curingas do LIKE continuam sendo resolvidos pelo SQLite
+            query = """
+                SELECT
+                    item_name,
+                    current_stock,
+                    min_stock_level,
+                    unit_price,
+                    (current_stock < min_stock_level) AS is_low
+                FROM inventory
+                WHERE LOWER(item_name) LIKE LOWER(?)
+                ORDER BY item_name
+            """
+            async with acquire_reader(ctx.deps.db_path) as conn:
+                rows = conn.execute(query, (f"%{search_term}%",)).fetchall()
+        else:
+            # Busca parcial pelo índice de trigramas em memória
+            rows = (await _get_search_index(ctx.deps.db_path)).match(search_term)
+
+        if not rows:
             logger.warning(f"⚠️ No products found matching: {search_term}")
             return f"❌ No products found matching '{search_term}'. Try different keywords or ask for our complete catalog."
 
-        # Formatar resultados
-        results = [f"🔍 **Found {len(df)} product(s) matching '{search_term}':**\n"]
+        # Formatar resultados direto em um único buffer
+        buffer = io.StringIO()
+        buffer.write(f"🔍 **Found {len(rows)} product(s) matching '{search_term}':**\n\n")
 
-        for _, row in df.iterrows():
-            item = InventoryItem(
-                product_name=row["item_name"],
-                stock_level=row["current_stock"],
-                min_stock_level=row["min_stock_level"],
-                unit_cost=row["unit_price"],
-                is_low_stock=check_low_stock(row["current_stock"], row["min_stock_level"]),
-            )
-            results.append(
-                f"• {item.product_name}: {item.stock_status} (${item.unit_cost:.2f}/unit)"
-            )
+        for row in rows:
+            status = _format_status(row["current_stock"], row["is_low"])
+            buffer.write(f"• {row['item_name']}: {status} (${row['unit_price']:.2f}/unit)\n")
 
-        logger.success(f"✅ Found {len(df)} matching products")
-        return "\n".join(results)
+        logger.success(f"✅ Found {len(rows)} matching products")
+        return buffer.getvalue().rstrip("\n")
 
     except Exception as e:
         logger.error(f"❌ Error searching products: {e}")
@@ -328,18 +438,8 @@ async def check_availability_for_order(
     logger.info(f"🔍 Checking availability: {product_name} x{quantity}")
 
     try:
-        conn = get_db_connection(ctx.deps.db_path)
-        cursor = conn.cursor()
-
-        query = """
-            SELECT current_stock, item_name
-            FROM inventory
-            WHERE LOWER(item_name) = LOWER(?)
-        """
-
-        cursor.execute(query, (product_name,))
-        row = cursor.fetchone()
-        conn.close()
+        async with acquire_reader(ctx.deps.db_path) as conn:
+            row = conn.execute(_PREPARED["availability_by_name"], (product_name,)).fetchone()
 
         if not row:
             return f"❌ UNAVAILABLE: Product '{product_name}' not found in inventory."
@@ -366,6 +466,40 @@ async def check_availability_for_order(
 # ============================================================================
 
 
+# Mesmo predicado de is_low, filtrado pelo SQLite com os índices de estoque baixo (src/db/schema.py)
+# em vez de trazer o inventário inteiro; maior déficit primeiro, empates na ordem do inventário
+_LOW_STOCK_SQL = """
+    SELECT
+        item_name,
+        current_stock,
+        min_stock_level,
+        (min_stock_level - current_stock) AS deficit
+    FROM inventory
+    WHERE current_stock < min_stock_level
+    ORDER BY deficit DESC, rowid
+"""
+
+
+def _render_low_stock(rows: list) -> tuple[str, int]:
+    """Relatório de itens abaixo do mínimo e nº de itens"""
+    if not rows:
+        return "✅ All inventory items are at or above minimum stock levels.", 0
+
+    # Formatar lista de items baixos
+    low_stock_items = [
+        f"• {row['item_name']}: {row['current_stock']}/{row['min_stock_level']} units "
+        f"(need {row['deficit']} more)"
+        for row in rows
+    ]
+
+    return f"⚠️ **{len(rows)} item(s) below minimum stock:**\n" + "\n".join(low_stock_items), len(rows)
+
+
+async def _low_stock_report(db_path: str) -> tuple[str, int]:
+    """Itens abaixo do mínimo, formatados (cache: ver _snapshot_bucket)"""
+    return await _cached_report(db_path, _LOW_STOCK_SQL, _render_low_stock)
+
+
 @inventory_agent.tool
 async def get_low_stock_items(ctx: RunContext[InventoryDependencies]) -> str:
     """
@@ -378,37 +512,12 @@ async def get_low_stock_items(ctx: RunContext[InventoryDependencies]) -> str:
     logger.info("🔍 Checking for low stock items...")
 
     try:
-        conn = get_db_connection(ctx.deps.db_path)
-
-        query = """
-            SELECT 
-                item_name,
-                current_stock,
-                min_stock_level,
-                unit_price
-            FROM inventory
-            WHERE current_stock < min_stock_level
-            ORDER BY (min_stock_level - current_stock) DESC
-        """
-
-        df = pd.read_sql_query(query, conn)
-        conn.close()
-
-        if df.empty:
-            logger.success("✅ All items are adequately stocked")
-            return "✅ All inventory items are at or above minimum stock levels."
-
-        # Formatar lista de items baixos
-        low_stock_items = []
-        for _, row in df.iterrows():
-            deficit = row["min_stock_level"] - row["current_stock"]
-            low_stock_items.append(
-                f"• {row['item_name']}: {row['current_stock']}/{row['min_stock_level']} units "
-                f"(need {deficit} more)"
-            )
+        result, count = await _low_stock_report(ctx.deps.db_path)
 
-        result = f"⚠️ **{len(df)} item(s) below minimum stock:**\n" + "\n".join(low_stock_items)
-        logger.warning(f"⚠️ Found {len(df)} items needing restock")
+        if count:
+            logger.warning(f"⚠️ Found {count} items needing restock")
+        else:
+            logger.success("✅ All items are adequately stocked")
 
         return result
 
@@ -440,7 +549,10 @@ async def query_inventory(question: str, db_path: str = "munder_difflin.db") ->
     logger.info(f"💬 Inventory query: {question}")
 
     try:
-        result = await inventory_agent.run(question, deps=InventoryDependencies(db_path=db_path))
+        async with llm_slot():
+            result = await inventory_agent.run(
+                question, deps=InventoryDependencies(db_path=db_path)
+            )
         return result.output
 
     except Exception as e:
@@ -3,12 +3,24 @@ Orchestrator Agent - Central coordinator for the multi-agent system
 Routes customer requests to specialized agents
 """
 
+import asyncio
+import re
 import sys
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from functools import cache
 from typing import Literal
 
 from loguru import logger
 from pydantic import BaseModel, Field
-from pydantic_ai import Agent, RunContext
+from pydantic_ai import RunContext
+
+from src.db import catalog_version
+
+from ._runtime import llm_slot
+from .routing_cache import routing_cache
 
 # ============================================================================
 # MODELS - Estruturas de dados
@@ -31,7 +43,8 @@ class AgentResponse(BaseModel):
     data: dict | None = None
 
 
-class OrchestratorDependencies(BaseModel):
+@dataclass(slots=True, frozen=True)
+class OrchestratorDependencies:
     """Dependências compartilhadas entre agentes"""
 
     db_path: str = "munder_difflin.db"
@@ -61,26 +74,40 @@ Decision Logic:
 - If customer asks for "price", "quote", "how much", "cost" → QuotingAgent  
 - If customer wants to "buy", "order", "purchase", "place order" → SalesAgent
 - If request is complex, you may need to coordinate multiple agents
+- If a request needs several agents at once (e.g. check stock AND quote), make a single
+  delegate_parallel call covering all of them instead of separate delegate_* calls
 
 Always be professional, clear, and helpful. Think step-by-step before deciding.
 """
 
 
 # ============================================================================
-# ORCHESTRATOR AGENT
+# INVENTORY SHORTCUTS - Pedidos de listagem respondidos sem LLM
 # ============================================================================
 
-# Importar configuração de teste se estivermos em modo de teste
-if "pytest" in sys.modules:
-    from src.test_config import create_test_agent
+# Só pedidos inteiros de listagem: qualquer filtro extra ("under $5", um produto) vai ao LLM
+_LIST_ALL = re.compile(
+    r"^\s*(please\s+)?(show|list)( me)?( all)?( of)?( the| your)?\s*(inventory|products|items)"
+    r"( in (stock|inventory))?[\s.?!]*$",
+    re.IGNORECASE,
+)
+_LOW_STOCK = re.compile(
+    r"^\s*(show|list|which|what)\b[\w\s]*\b(low (on )?stock|running low|below minimum)\b[\w\s]*[.?!]*\s*$",
+    re.IGNORECASE,
+)
 
-    orchestrator_agent = create_test_agent(ORCHESTRATOR_SYSTEM_PROMPT, OrchestratorDependencies)
-else:
-    orchestrator_agent = Agent(
-        model="openai:gpt-4o",  # Modelo mais inteligente para coordenação
-        system_prompt=ORCHESTRATOR_SYSTEM_PROMPT,
-        deps_type=OrchestratorDependencies,
-    )
+
+async def _inventory_shortcut(query: str, db_path: str) -> str | None:
+    """Relatório pronto do Inventory Agent para listagens padrão, ou None para usar o LLM"""
+    if _LIST_ALL.match(query):
+        from .inventory_agent import _all_inventory_report
+
+        return (await _all_inventory_report(db_path))[0]
+    if _LOW_STOCK.match(query):
+        from .inventory_agent import _low_stock_report
+
+        return (await _low_stock_report(db_path))[0]
+    return None
 
 
 # ============================================================================
@@ -88,7 +115,6 @@ else:
 # ============================================================================
 
 
-@orchestrator_agent.tool
 async def delegate_to_inventory(ctx: RunContext[OrchestratorDependencies], query: str) -> str:
     """
     Delegate request to Inventory Agent for stock checking and product search.
@@ -100,15 +126,21 @@ async def delegate_to_inventory(ctx: RunContext[OrchestratorDependencies], query
     Returns:
         Response from Inventory Agent
     """
-    logger.info(f"🔄 Orchestrator delegating to InventoryAgent: {query}")
+    logger.info("🔄 Orchestrator delegating to InventoryAgent: {}", query)
 
     # Import aqui para evitar circular imports
     from .inventory_agent import InventoryDependencies, inventory_agent
 
     try:
-        result = await inventory_agent.run(
-            query, deps=InventoryDependencies(db_path=ctx.deps.db_path)
-        )
+        shortcut = await _inventory_shortcut(query, ctx.deps.db_path)
+        if shortcut is not None:
+            logger.success("✅ Inventory listing answered without the InventoryAgent LLM")
+            return shortcut
+
+        async with llm_slot():
+            result = await inventory_agent.run(
+                query, deps=InventoryDependencies(db_path=ctx.deps.db_path)
+            )
 
         logger.success("✅ InventoryAgent responded successfully")
         return result.output
@@ -123,7 +155,6 @@ async def delegate_to_inventory(ctx: RunContext[OrchestratorDependencies], query
 # ============================================================================
 
 
-@orchestrator_agent.tool
 async def delegate_to_quoting(
     ctx: RunContext[OrchestratorDependencies], product_name: str, quantity: int
 ) -> str:
@@ -138,16 +169,19 @@ async def delegate_to_quoting(
     Returns:
         Price quote from Quoting Agent
     """
-    logger.info(f"🔄 Orchestrator delegating to QuotingAgent: {product_name} x{quantity}")
+    logger.info("🔄 Orchestrator delegating to QuotingAgent: {} x{}", product_name, quantity)
 
-    from .quoting_agent import QuotingDependencies, quoting_agent
+    from .quoting_agent import QuotingDependencies, get_quoting_agent
 
     try:
         query = f"Generate quote for {quantity} units of {product_name}"
-        result = await quoting_agent.run(
-            query,
-            deps=QuotingDependencies(db_path=ctx.deps.db_path, customer_id=ctx.deps.customer_id),
-        )
+        async with llm_slot():
+            result = await get_quoting_agent().run(
+                query,
+                deps=QuotingDependencies(
+                    db_path=ctx.deps.db_path, customer_id=ctx.deps.customer_id
+                ),
+            )
 
         logger.success("✅ QuotingAgent responded successfully")
         return result.output
@@ -162,7 +196,6 @@ async def delegate_to_quoting(
 # ============================================================================
 
 
-@orchestrator_agent.tool
 async def delegate_to_sales(
     ctx: RunContext[OrchestratorDependencies], product_name: str, quantity: int, quoted_price: float
 ) -> str:
@@ -179,17 +212,18 @@ async def delegate_to_sales(
         Order confirmation from Sales Agent
     """
     logger.info(
-        f"🔄 Orchestrator delegating to SalesAgent: {product_name} x{quantity} @ ${quoted_price}"
+        "🔄 Orchestrator delegating to SalesAgent: {} x{} @ ${}", product_name, quantity, quoted_price
     )
 
     from .sales_agent import SalesDependencies, sales_agent
 
     try:
         query = f"Process order: {quantity} units of {product_name} at ${quoted_price} per unit"
-        result = await sales_agent.run(
-            query,
-            deps=SalesDependencies(db_path=ctx.deps.db_path, customer_id=ctx.deps.customer_id),
-        )
+        async with llm_slot():
+            result = await sales_agent.run(
+                query,
+                deps=SalesDependencies(db_path=ctx.deps.db_path, customer_id=ctx.deps.customer_id),
+            )
 
         logger.success("✅ SalesAgent responded successfully")
         return result.output
@@ -199,10 +233,308 @@ async def delegate_to_sales(
         return f"Error processing order: {str(e)}"
 
 
+# ============================================================================
+# TOOL: Delegate to several agents at once (compound requests)
+# ============================================================================
+
+
+# Strong references to order runs, which outlive a cancelled delegate_parallel call
+_orders_in_flight: set[asyncio.Task] = set()
+
+
+async def delegate_parallel(
+    ctx: RunContext[OrchestratorDependencies],
+    inventory_query: str | None = None,
+    quote_product: str | None = None,
+    quote_quantity: int | None = None,
+    order_product: str | None = None,
+    order_quantity: int | None = None,
+    order_price: float | None = None,
+) -> str:
+    """
+    Delegate a compound request to several agents concurrently.
+    Use this instead of separate delegate_* calls when a request needs more than one agent.
+
+    Args:
+        ctx: Context with dependencies
+        inventory_query: Inventory question for the InventoryAgent (optional)
+        quote_product: Product to quote with the QuotingAgent (optional, needs quote_quantity)
+        quote_quantity: Quantity to quote
+        order_product: Product to order with the SalesAgent (optional, needs order_quantity and order_price)
+        order_quantity: Quantity to order
+        order_price: Price per unit (from quote)
+
+    Returns:
+        Combined responses, one section per agent
+    """
+    requests = []
+    if inventory_query:
+        requests.append(("Inventory", "inventory", inventory_query))
+    if quote_product and quote_quantity:
+        requests.append(
+            ("Quote", "quoting", f"Generate quote for {quote_quantity} units of {quote_product}")
+        )
+    if order_product and order_quantity and order_price is not None:
+        requests.append(
+            (
+                "Order",
+                "sales",
+                f"Process order: {order_quantity} units of {order_product} at ${order_price} per unit",
+            )
+        )
+
+    if not requests:
+        return "No delegation requested: provide an inventory query, a quote or an order."
+
+    logger.info("🔄 Orchestrator delegating in parallel to {} agent(s)", len(requests))
+
+    # Sub-agent LLM calls overlap, so latency is the slowest call instead of the sum.
+    # The first failure cancels the read-only calls still in flight, but never the
+    # order: process_order may already have committed the sale
+    order_task = None
+    if requests[-1][1] == "sales":
+        order_task = asyncio.create_task(_run_direct("sales", requests[-1][2], ctx.deps))
+        _orders_in_flight.add(order_task)
+        order_task.add_done_callback(_orders_in_flight.discard)
+
+    tasks = {}
+    try:
+        async with asyncio.TaskGroup() as tg:
+            for label, route, query in requests:
+                if route != "sales":
+                    tasks[label] = tg.create_task(_run_direct(route, query, ctx.deps))
+    except ExceptionGroup:
+        pass  # Reported per agent below
+
+    if order_task is not None:
+        tasks["Order"] = order_task
+        try:
+            # If this call is cancelled the order still runs to completion
+            await asyncio.shield(order_task)
+        except asyncio.CancelledError:
+            if not order_task.cancelled():
+                raise
+        except Exception:
+            pass  # Reported below
+
+    sections = []
+    for label, task in tasks.items():
+        if task is order_task and task.cancelled():
+            result = "Unknown: the order may have been placed - check the order status before retrying"
+        elif task.cancelled():
+            result = "Cancelled: another agent failed first"
+        elif (error := task.exception()) is not None:
+            logger.error(f"❌ Error in parallel delegation ({label}): {error}")
+            result = f"Error: {str(error)}"
+        else:
+            result = task.result()
+        sections.append(f"**{label}:**\n{result}")
+
+    return "\n\n".join(sections)
+
+
+# ============================================================================
+# ORCHESTRATOR AGENT
+# ============================================================================
+
+# O system prompt é estático e vai sempre primeiro, então o prefixo (prompt + tools)
+# é reaproveitado pelo cache automático de prompts da OpenAI; a cache key mantém as
+# chamadas deste agente no mesmo shard de cache
+_PROMPT_CACHE_SETTINGS = {"extra_body": {"prompt_cache_key": "munder-difflin-orchestrator"}}
+
+
+@cache
+def get_orchestrator_agent():
+    """
+    Cria o Orchestrator Agent no primeiro uso.
+
+    Adiar a criação do agente (e do cliente OpenAI) mantém o import deste módulo
+    barato - pedidos roteados por regras nem chegam a precisar dele.
+    """
+    # Importar configuração de teste se estivermos em modo de teste
+    if "pytest" in sys.modules:
+        from src.test_config import create_test_agent
+
+        agent = create_test_agent(ORCHESTRATOR_SYSTEM_PROMPT, OrchestratorDependencies)
+    else:
+        from pydantic_ai import Agent
+
+        from ._http import openai_model
+
+        agent = Agent(
+            model=openai_model("gpt-4o"),  # Modelo mais inteligente para coordenação
+            system_prompt=ORCHESTRATOR_SYSTEM_PROMPT,
+            deps_type=OrchestratorDependencies,
+            model_settings=_PROMPT_CACHE_SETTINGS,
+        )
+
+    for tool in (delegate_to_inventory, delegate_to_quoting, delegate_to_sales, delegate_parallel):
+        agent.tool(tool)
+    return agent
+
+
+@cache
+def _get_router_model():
+    """
+    Modelo menor para pedidos sem palavra-chave de nenhum agente; o gpt-4o fica
+    para os que envolvem vários agentes e precisam de coordenação.
+    """
+    if "pytest" in sys.modules:
+        return None  # O agente de teste já usa o modelo menor
+
+    from ._http import openai_model
+
+    return openai_model("gpt-4o-mini")
+
+
+def __getattr__(name: str):
+    """Mantém `orchestrator_agent` importável como atributo do módulo"""
+    if name == "orchestrator_agent":
+        return get_orchestrator_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 # ============================================================================
 # MAIN FUNCTION - Entry point for customer requests
 # ============================================================================
 
+# Respostas de consultas de estoque por (texto normalizado, customer_id, db_path): LRU com
+# TTL, descartadas quando uma venda ou reposição muda o estoque (catalog_version)
+_RESPONSE_CACHE_SIZE = 1024
+_RESPONSE_CACHE_TTL = 60.0  # segundos
+_response_cache: OrderedDict[tuple, tuple[float, int, str]] = OrderedDict()
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = "!.?"
+
+_TRIVIAL_RESPONSES = {
+    "hi": "Hello! Welcome to Munder Difflin Paper Company. How can I help you today?",
+    "hello": "Hello! Welcome to Munder Difflin Paper Company. How can I help you today?",
+    "thanks": "You're welcome! Let me know if there's anything else I can help with.",
+    "thank you": "You're welcome! Let me know if there's anything else I can help with.",
+}
+
+
+# "my order", "the quote"...: referência a algo que já existe, não um pedido novo
+_NOT_REFERENCE = r"(?<!\bmy )(?<!\bour )(?<!\byour )(?<!\bthe )(?<!\bthat )"
+
+# Palavras-chave da "Decision Logic" do system prompt, por agente especializado
+_INTENT_PATTERNS = {
+    "inventory": re.compile(r"\b(availab\w*|stock|do you have)\b", re.IGNORECASE),
+    "quoting": re.compile(
+        rf"\b(prices?|pricing|{_NOT_REFERENCE}quotes?|how much|costs?)\b", re.IGNORECASE
+    ),
+    "sales": re.compile(rf"\b(buy|{_NOT_REFERENCE}order|purchase)\b", re.IGNORECASE),
+}
+
+# Cotação/venda só vai direto ao agente quando o pedido cita quantidade ou produto
+# ("status of my order", "is my quote still valid" ficam para o LLM)
+_ORDER_DETAILS = re.compile(
+    r"\b(\d[\d,.]*|dozens?|hundreds?|thousands?|units?|sheets?|reams?|packs?|boxes|box|rolls?"
+    r"|paper|cardstock|stock|plates|folders|cards|covers)\b",
+    re.IGNORECASE,
+)
+
+
+def _matched_intents(text: str) -> list[str]:
+    """Agentes cujas palavras-chave aparecem no pedido"""
+    return [route for route, pattern in _INTENT_PATTERNS.items() if pattern.search(text)]
+
+
+def classify_intent(text: str) -> Literal["inventory", "quoting", "sales", "ambiguous"]:
+    """
+    Roteamento por regras, sem LLM.
+
+    Returns:
+        O agente especializado quando só as palavras-chave dele casam (cotação e
+        venda também precisam de quantidade ou produto), senão "ambiguous"
+    """
+    matches = _matched_intents(text)
+    if len(matches) != 1:
+        return "ambiguous"
+    if matches[0] != "inventory" and not _ORDER_DETAILS.search(text):
+        return "ambiguous"
+    return matches[0]
+
+
+# Ferramenta de delegação -> agente especializado (usado pelo routing cache)
+_TOOL_ROUTES = {
+    "delegate_to_inventory": "inventory",
+    "delegate_to_quoting": "quoting",
+    "delegate_to_sales": "sales",
+}
+
+
+def _routes_taken(result) -> set[str]:
+    """Agentes especializados para os quais o Orchestrator delegou nesta execução"""
+    return {
+        _TOOL_ROUTES[part.tool_name]
+        for message in result.all_messages()
+        for part in message.parts
+        if getattr(part, "part_kind", None) == "tool-call" and part.tool_name in _TOOL_ROUTES
+    }
+
+
+async def _run_direct(route: str, request_text: str, deps: OrchestratorDependencies) -> str:
+    """Envia o pedido original direto ao agente especializado, sem o LLM do Orchestrator"""
+    if route == "inventory":
+        shortcut = await _inventory_shortcut(request_text, deps.db_path)
+        if shortcut is not None:
+            return shortcut
+
+        from .inventory_agent import InventoryDependencies, inventory_agent
+
+        async with llm_slot():
+            result = await inventory_agent.run(
+                request_text, deps=InventoryDependencies(db_path=deps.db_path)
+            )
+    elif route == "quoting":
+        from .quoting_agent import QuotingDependencies, get_quoting_agent
+
+        async with llm_slot():
+            result = await get_quoting_agent().run(
+                request_text,
+                deps=QuotingDependencies(db_path=deps.db_path, customer_id=deps.customer_id),
+            )
+    else:
+        from .sales_agent import SalesDependencies, sales_agent
+
+        async with llm_slot():
+            result = await sales_agent.run(
+                request_text,
+                deps=SalesDependencies(db_path=deps.db_path, customer_id=deps.customer_id),
+            )
+    return result.output
+
+
+def _normalize_request(request_text: str) -> str:
+    """Minúsculas, sem espaços nas pontas e com espaços internos colapsados"""
+    return _WHITESPACE.sub(" ", request_text.strip().lower())
+
+
+def _get_cached_response(key: tuple, db_path: str) -> str | None:
+    """Resposta em cache ainda válida (vencidas ou anteriores a uma mudança de estoque saem)"""
+    entry = _response_cache.get(key)
+    if entry is None:
+        return None
+    stored_at, version, response = entry
+    if (
+        time.monotonic() - stored_at >= _RESPONSE_CACHE_TTL
+        or version != catalog_version(db_path)
+    ):
+        del _response_cache[key]
+        return None
+    _response_cache.move_to_end(key)
+    return response
+
+
+def _store_cached_response(key: tuple, version: int, response: str) -> None:
+    """Guarda a resposta, removendo a menos usada quando o cache enche"""
+    _response_cache[key] = (time.monotonic(), version, response)
+    _response_cache.move_to_end(key)
+    if len(_response_cache) > _RESPONSE_CACHE_SIZE:
+        _response_cache.popitem(last=False)
+
 
 async def handle_customer_request(
     request_text: str, customer_id: str | None = None, db_path: str = "munder_difflin.db"
@@ -224,21 +556,120 @@ async def handle_customer_request(
         ... )
         >>> print(response)
     """
-    logger.info(f"📨 New customer request: {request_text}")
+    logger.info("📨 New customer request: {}", request_text)
+
+    normalized = _normalize_request(request_text)
+
+    # Cumprimentos/agradecimentos não precisam do LLM
+    trivial = _TRIVIAL_RESPONSES.get(normalized.rstrip(_TRAILING_PUNCTUATION))
+    if trivial is not None:
+        return trivial
+
+    cache_key = (normalized, customer_id, db_path)
+    cached = _get_cached_response(cache_key, db_path)
+    if cached is not None:
+        logger.success("✅ Request answered from cache")
+        return cached
+    version = catalog_version(db_path)
+
+    deps = OrchestratorDependencies(db_path=db_path, customer_id=customer_id)
 
     try:
-        result = await orchestrator_agent.run(
-            request_text, deps=OrchestratorDependencies(db_path=db_path, customer_id=customer_id)
-        )
+        # Palavras-chave de um só agente, ou pedido parecido já roteado antes:
+        # vai direto ao agente especializado. Pedidos compostos nunca usam o cache,
+        # que mandaria tudo a um só agente e descartaria a outra intenção
+        intent = classify_intent(request_text)
+        multi_agent = len(_matched_intents(request_text)) > 1
+        route = intent if intent != "ambiguous" else None
+        if route is None and not multi_agent:
+            route = await routing_cache.alookup(request_text)
+        if route is not None:
+            logger.info("🧭 Routing directly to {} ({})", route, "rules" if route == intent else "cache")
+            output = await _run_direct(route, request_text, deps)
+            routes = {route}
+        else:
+            async with llm_slot():
+                result = await get_orchestrator_agent().run(
+                    request_text, deps=deps, model=None if multi_agent else _get_router_model()
+                )
+            output = result.output
+
+            routes = _routes_taken(result)
+            # Vendas não são lembradas: um pedido só parecido não pode fechar outra venda
+            if len(routes) == 1 and routes != {"sales"}:
+                await routing_cache.aremember(request_text, next(iter(routes)))
+
+        # Só leituras de estoque são reaproveitadas: cotações gravam no banco e vendas
+        # confirmam pedidos, mesmo quando o texto não diz "buy"/"order"
+        if routes == {"inventory"}:
+            _store_cached_response(cache_key, version, output)
 
         logger.success("✅ Request handled successfully")
-        return result.output
+        return output
 
     except Exception as e:
         logger.error(f"❌ Error handling request: {e}")
         return f"Sorry, I encountered an error processing your request: {str(e)}"
 
 
+async def _produce_quote_stream(
+    request_text: str, customer_id: str | None, db_path: str, chunks: asyncio.Queue
+) -> None:
+    """Coloca os trechos da cotação na fila; None marca o fim (mesmo em caso de erro)"""
+    from .quoting_agent import QuotingDependencies, get_quoting_agent
+
+    try:
+        async with llm_slot(), get_quoting_agent().run_stream(
+            request_text, deps=QuotingDependencies(db_path=db_path, customer_id=customer_id)
+        ) as stream:
+            async for chunk in stream.stream_text(delta=True):
+                chunks.put_nowait(chunk)
+    finally:
+        chunks.put_nowait(None)
+
+
+async def stream_customer_request(
+    request_text: str, customer_id: str | None = None, db_path: str = "munder_difflin.db"
+) -> AsyncIterator[str]:
+    """
+    Streaming variant of handle_customer_request.
+
+    Quote requests go straight to the Quoting Agent and its answer is yielded
+    as it is generated, so a UI can start rendering before the quote is done.
+    Any other request yields the complete handle_customer_request response once.
+
+    Example:
+        >>> async for chunk in stream_customer_request("How much does A4 paper cost?"):
+        ...     print(chunk, end="", flush=True)
+    """
+    if classify_intent(request_text) != "quoting":
+        yield await handle_customer_request(request_text, customer_id, db_path)
+        return
+
+    logger.info("📨 New streamed quote request: {}", request_text)
+
+    # O slot do LLM (e o ContextVar dele) fica com a task produtora, que nunca espera o
+    # consumidor: a fila é ilimitada, então o slot é liberado quando o modelo termina,
+    # mesmo que quem itera este gerador seja lento ou o abandone no meio
+    chunks: asyncio.Queue[str | None] = asyncio.Queue()
+    producer = asyncio.create_task(
+        _produce_quote_stream(request_text, customer_id, db_path, chunks)
+    )
+    try:
+        while (chunk := await chunks.get()) is not None:
+            yield chunk
+        await producer
+
+        logger.success("✅ Streamed quote request handled successfully")
+
+    except Exception as e:
+        logger.error(f"❌ Error streaming quote request: {e}")
+        yield f"Sorry, I encountered an error processing your request: {str(e)}"
+
+    finally:
+        producer.cancel()
+
+
 # ============================================================================
 # EXAMPLE USAGE
 # ============================================================================
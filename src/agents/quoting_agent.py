@@ -5,13 +5,19 @@ Generates accurate quotes based on inventory prices and customer requirements
 
 import sqlite3
 import sys
+from bisect import bisect_right
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from functools import cache, lru_cache
 from typing import Any
 
-import pandas as pd
 from loguru import logger
 from pydantic import BaseModel, Field, field_validator
-from pydantic_ai import Agent, RunContext
+from pydantic_ai import RunContext
+
+from src.db import acquire_reader, acquire_writer, lookup_item
+
+from ._runtime import llm_slot
 
 # ============================================================================
 # MODELS - Estruturas de dados
@@ -50,37 +56,30 @@ class Quote(BaseModel):
 
     def to_formatted_string(self) -> str:
         """Retorna cotação formatada para apresentação"""
-        lines = [
-            f"📋 **Quote #{self.request_id}**",
-            "",
-            f"Product: {self.item_name}",
-            f"Quantity: {self.quantity:,} units",
-            f"Unit Price: ${self.unit_price:.2f}",
-            "",
-            f"Subtotal: ${self.subtotal:,.2f}",
-        ]
-
-        if self.discount_percentage > 0:
-            lines.extend(
-                [
-                    f"Discount ({self.discount_percentage:.0f}%): -${self.discount_amount:,.2f}",
-                    "",
-                ]
-            )
-
-        lines.extend(
-            [
-                f"**TOTAL: ${self.total_price:,.2f}**",
-                "",
-                f"Valid until: {self.valid_until}",
-                f"Generated: {self.created_at}",
-            ]
+        discount_block = (
+            f"Discount ({self.discount_percentage:.0f}%): -${self.discount_amount:,.2f}\n\n"
+            if self.discount_percentage > 0
+            else ""
         )
 
-        return "\n".join(lines)
+        return (
+            f"📋 **Quote #{self.request_id}**\n"
+            "\n"
+            f"Product: {self.item_name}\n"
+            f"Quantity: {self.quantity:,} units\n"
+            f"Unit Price: ${self.unit_price:.2f}\n"
+            "\n"
+            f"Subtotal: ${self.subtotal:,.2f}\n"
+            f"{discount_block}"
+            f"**TOTAL: ${self.total_price:,.2f}**\n"
+            "\n"
+            f"Valid until: {self.valid_until}\n"
+            f"Generated: {self.created_at}"
+        )
 
 
-class QuotingDependencies(BaseModel):
+@dataclass(slots=True, frozen=True)
+class QuotingDependencies:
     """Dependências para o Quoting Agent"""
 
     db_path: str = "munder_difflin.db"
@@ -104,6 +103,24 @@ class DiscountTiers:
         (50, 0.02),  # 2% para 50-199 unidades
     ]
 
+    # TIERS em ordem crescente de quantidade, para busca binária
+    _SORTED_QTYS = tuple(min_qty for min_qty, _ in reversed(TIERS))
+    _SORTED_DISCOUNTS = (0.0,) + tuple(discount for _, discount in reversed(TIERS))
+
+    # Os níveis nunca mudam: o texto de apresentação é montado uma única vez
+    _DISCOUNT_INFO = "\n".join(
+        [
+            "💰 **Bulk Discount Tiers:**",
+            *(f"• {min_qty:,}+ units: {discount * 100:.0f}% off" for min_qty, discount in TIERS),
+        ]
+    )
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _tier(quantity: int) -> float:
+        """Desconto do maior nível cujo mínimo é <= quantity (0.0 abaixo do menor)"""
+        return DiscountTiers._SORTED_DISCOUNTS[bisect_right(DiscountTiers._SORTED_QTYS, quantity)]
+
     @classmethod
     def get_discount_percentage(cls, quantity: int) -> float:
         """
@@ -115,21 +132,17 @@ class DiscountTiers:
         Returns:
             Percentual de desconto (0.0 a 0.15)
         """
-        for min_qty, discount in cls.TIERS:
-            if quantity >= min_qty:
-                logger.info(f"💰 Applied {discount * 100:.0f}% discount for {quantity} units")
-                return discount
-
-        logger.info(f"💰 No discount applied for {quantity} units")
-        return 0.0
+        discount = cls._tier(quantity)
+        if discount:
+            logger.debug("💰 Applied {:.0%} discount for {} units", discount, quantity)
+        else:
+            logger.debug("💰 No discount applied for {} units", quantity)
+        return discount
 
     @classmethod
     def get_discount_info(cls) -> str:
         """Retorna informação formatada sobre os níveis de desconto"""
-        lines = ["💰 **Bulk Discount Tiers:**"]
-        for min_qty, discount in cls.TIERS:
-            lines.append(f"• {min_qty:,}+ units: {discount * 100:.0f}% off")
-        return "\n".join(lines)
+        return cls._DISCOUNT_INFO
 
 
 # ============================================================================
@@ -169,38 +182,43 @@ Use the provided tools to access pricing data and generate quotes.
 
 
 # ============================================================================
-# QUOTING AGENT
+# HELPER FUNCTIONS
 # ============================================================================
 
-# Importar configuração de teste se estivermos em modo de teste
-if "pytest" in sys.modules:
-    from src.test_config import create_test_agent
 
-    quoting_agent = create_test_agent(QUOTING_SYSTEM_PROMPT, QuotingDependencies)
-else:
-    quoting_agent = Agent(
-        model="openai:gpt-4o-mini",
-        system_prompt=QUOTING_SYSTEM_PROMPT,
-        deps_type=QuotingDependencies,
-    )
-
-
-# ============================================================================
-# HELPER FUNCTIONS
-# ============================================================================
+# Textos SQL fixos: o mesmo objeto string a cada chamada acerta o cache de statements do sqlite3
+_SQL_INSERT_QUOTE = "INSERT INTO quotes (request_id, total_amount, quote_explanation) VALUES (?, ?, ?)"
+# Filtros opcionais como "? IS NULL OR ..." para o texto da query não variar
+_SQL_HISTORY = """
+    SELECT
+        request_id,
+        customer_id,
+        item_name,
+        quantity,
+        unit_price,
+        discount_percentage,
+        total_price,
+        status,
+        created_at,
+        valid_until
+    FROM quotes
+    WHERE (? IS NULL OR item_name LIKE ?)
+      AND (? IS NULL OR customer_id = ?)
+    ORDER BY created_at DESC
+    LIMIT ?
+"""
+_SQL_QUOTE_BY_ID = "SELECT * FROM quotes WHERE request_id = ?"
 
 
-def get_db_connection(db_path: str) -> sqlite3.Connection:
-    """Cria conexão com o banco de dados"""
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    return conn
+async def _lookup_item(db_path: str, item_name: str) -> sqlite3.Row | None:
+    """Nome, preço e estoque do produto (case-insensitive), via cache do catálogo"""
+    async with acquire_reader(db_path) as conn:
+        return lookup_item(conn, db_path, item_name)
 
 
-def generate_request_id() -> str:
-    """Gera ID único para cotação"""
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    return f"Q{timestamp}"
+def generate_request_id(now: datetime | None = None) -> str:
+    """Gera ID único para cotação (a partir de now, se informado)"""
+    return f"Q{now or datetime.now():%Y%m%d%H%M%S}"
 
 
 def calculate_quote_totals(unit_price: float, quantity: int, discount_pct: float) -> tuple:
@@ -222,7 +240,6 @@ def calculate_quote_totals(unit_price: float, quantity: int, discount_pct: float
 # ============================================================================
 
 
-@quoting_agent.tool
 async def get_product_price(ctx: RunContext[QuotingDependencies], item_name: str) -> str:
     """
     Get the unit price for a specific product.
@@ -234,21 +251,10 @@ async def get_product_price(ctx: RunContext[QuotingDependencies], item_name: str
     Returns:
         Unit price information
     """
-    logger.info(f"💰 Getting price for: {item_name}")
+    logger.info("💰 Getting price for: {}", item_name)
 
     try:
-        conn = get_db_connection(ctx.deps.db_path)
-        cursor = conn.cursor()
-
-        query = """
-            SELECT item_name, unit_price, current_stock
-            FROM inventory
-            WHERE LOWER(item_name) = LOWER(?)
-        """
-
-        cursor.execute(query, (item_name,))
-        row = cursor.fetchone()
-        conn.close()
+        row = await _lookup_item(ctx.deps.db_path, item_name)
 
         if not row:
             logger.warning(f"⚠️ Product not found: {item_name}")
@@ -267,7 +273,7 @@ Current Stock: {stock:,} units
 {DiscountTiers.get_discount_info()}
 """
 
-        logger.success(f"✅ Price retrieved: ${unit_price:.2f}")
+        logger.success("✅ Price retrieved: ${:.2f}", unit_price)
         return response.strip()
 
     except Exception as e:
@@ -280,7 +286,6 @@ Current Stock: {stock:,} units
 # ============================================================================
 
 
-@quoting_agent.tool
 async def generate_quote(
     ctx: RunContext[QuotingDependencies], item_name: str, quantity: int
 ) -> str:
@@ -296,24 +301,13 @@ async def generate_quote(
     Returns:
         Formatted quote with pricing breakdown
     """
-    logger.info(f"📋 Generating quote: {item_name} x{quantity}")
+    logger.info("📋 Generating quote: {} x{}", item_name, quantity)
 
     try:
         # 1. Verificar se produto existe e pegar preço
-        conn = get_db_connection(ctx.deps.db_path)
-        cursor = conn.cursor()
-
-        query = """
-            SELECT item_name, unit_price, current_stock
-            FROM inventory
-            WHERE LOWER(item_name) = LOWER(?)
-        """
-
-        cursor.execute(query, (item_name,))
-        row = cursor.fetchone()
+        row = await _lookup_item(ctx.deps.db_path, item_name)
 
         if not row:
-            conn.close()
             logger.warning(f"⚠️ Product not found: {item_name}")
             return f"❌ Product '{item_name}' not found. Please check the product name."
 
@@ -337,9 +331,10 @@ async def generate_quote(
         )
 
         # 4. Gerar Quote
-        request_id = generate_request_id()
-        created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        valid_until = (datetime.now() + timedelta(days=30)).strftime("%Y-%m-%d")
+        now = datetime.now()
+        request_id = generate_request_id(now)
+        created_at = f"{now:%Y-%m-%d %H:%M:%S}"
+        valid_until = f"{now + timedelta(days=30):%Y-%m-%d}"
 
         quote_explanation = f"Quote for {quantity} units of {actual_name} at ${unit_price:.2f} per unit"
         if discount_pct > 0:
@@ -360,23 +355,16 @@ async def generate_quote(
         )
 
         # 5. Salvar no banco de dados
-        insert_query = """
-            INSERT INTO quotes (
-                request_id, total_amount, quote_explanation
-            ) VALUES (?, ?, ?)
-        """
-
-        cursor.execute(
-            insert_query,
-            (
-                quote.request_id,
-                quote.total_price,
-                quote.quote_explanation,
-            ),
-        )
-
-        conn.commit()
-        conn.close()
+        async with acquire_writer(ctx.deps.db_path) as conn:
+            conn.execute(
+                _SQL_INSERT_QUOTE,
+                (
+                    quote.request_id,
+                    quote.total_price,
+                    quote.quote_explanation,
+                ),
+            )
+            conn.commit()
 
         # 6. Formatar resposta
         response = quote.to_formatted_string()
@@ -386,13 +374,11 @@ async def generate_quote(
 
         response += f"\n\n✅ Quote saved! Reference: #{request_id}"
 
-        logger.success(f"✅ Quote generated: {request_id} - ${total:,.2f}")
+        logger.success("✅ Quote generated: {} - ${:,.2f}", request_id, total)
         return response
 
     except Exception as e:
         logger.error(f"❌ Error generating quote: {e}")
-        if "conn" in locals():
-            conn.close()
         return f"Error generating quote: {str(e)}"
 
 
@@ -401,7 +387,6 @@ async def generate_quote(
 # ============================================================================
 
 
-@quoting_agent.tool
 async def search_quote_history(
     ctx: RunContext[QuotingDependencies],
     item_name: str | None = None,
@@ -423,50 +408,23 @@ async def search_quote_history(
     logger.info("🔍 Searching quote history...")
 
     try:
-        conn = get_db_connection(ctx.deps.db_path)
-
-        # Construir query dinâmica
-        query = """
-            SELECT 
-                request_id,
-                customer_id,
-                item_name,
-                quantity,
-                unit_price,
-                discount_percentage,
-                total_price,
-                status,
-                created_at,
-                valid_until
-            FROM quotes
-            WHERE 1=1
-        """
-        params = []
-
-        if item_name:
-            query += " AND LOWER(item_name) LIKE LOWER(?)"
-            params.append(f"%{item_name}%")
+        # None desativa o filtro correspondente
+        item_pattern = f"%{item_name}%" if item_name else None  # LIKE já é case-insensitive no SQLite
+        customer_filter = customer_id or ctx.deps.customer_id or None
 
-        if customer_id:
-            query += " AND customer_id = ?"
-            params.append(customer_id)
-        elif ctx.deps.customer_id:
-            query += " AND customer_id = ?"
-            params.append(ctx.deps.customer_id)
+        async with acquire_reader(ctx.deps.db_path) as conn:
+            rows = conn.execute(
+                _SQL_HISTORY,
+                (item_pattern, item_pattern, customer_filter, customer_filter, limit),
+            ).fetchall()
 
-        query += " ORDER BY created_at DESC LIMIT ?"
-        params.append(limit)
-
-        df = pd.read_sql_query(query, conn, params=params)
-        conn.close()
-
-        if df.empty:
+        if not rows:
             return "📋 No quotes found matching your criteria."
 
         # Formatar resultados
-        results = [f"📋 **Found {len(df)} quote(s):**\n"]
+        results = [f"📋 **Found {len(rows)} quote(s):**\n"]
 
-        for _, row in df.iterrows():
+        for row in rows:
             discount_info = ""
             if row["discount_percentage"] > 0:
                 discount_info = f" ({row['discount_percentage']:.0f}% discount)"
@@ -482,7 +440,7 @@ async def search_quote_history(
                 f"   • Status: {row['status'].upper()}\n"
             )
 
-        logger.success(f"✅ Found {len(df)} quotes")
+        logger.success("✅ Found {} quotes", len(rows))
         return "\n".join(results)
 
     except Exception as e:
@@ -495,7 +453,6 @@ async def search_quote_history(
 # ============================================================================
 
 
-@quoting_agent.tool
 async def get_quote_by_id(ctx: RunContext[QuotingDependencies], request_id: str) -> str:
     """
     Retrieve a specific quote by its ID.
@@ -507,21 +464,11 @@ async def get_quote_by_id(ctx: RunContext[QuotingDependencies], request_id: str)
     Returns:
         Detailed quote information
     """
-    logger.info(f"🔍 Retrieving quote: {request_id}")
+    logger.info("🔍 Retrieving quote: {}", request_id)
 
     try:
-        conn = get_db_connection(ctx.deps.db_path)
-        cursor = conn.cursor()
-
-        query = """
-            SELECT *
-            FROM quotes
-            WHERE request_id = ?
-        """
-
-        cursor.execute(query, (request_id,))
-        row = cursor.fetchone()
-        conn.close()
+        async with acquire_reader(ctx.deps.db_path) as conn:
+            row = conn.execute(_SQL_QUOTE_BY_ID, (request_id,)).fetchone()
 
         if not row:
             logger.warning(f"⚠️ Quote not found: {request_id}")
@@ -550,7 +497,7 @@ async def get_quote_by_id(ctx: RunContext[QuotingDependencies], request_id: str)
         if row["customer_id"]:
             response += f"\nCustomer: {row['customer_id']}"
 
-        logger.success(f"✅ Quote retrieved: {request_id}")
+        logger.success("✅ Quote retrieved: {}", request_id)
         return response
 
     except Exception as e:
@@ -563,7 +510,6 @@ async def get_quote_by_id(ctx: RunContext[QuotingDependencies], request_id: str)
 # ============================================================================
 
 
-@quoting_agent.tool
 async def calculate_custom_quote(
     ctx: RunContext[QuotingDependencies],
     item_name: str,
@@ -584,7 +530,7 @@ async def calculate_custom_quote(
         Calculated quote preview
     """
     logger.info(
-        f"🧮 Calculating custom quote: {item_name} x{quantity} @ {custom_discount_pct}% off"
+        "🧮 Calculating custom quote: {} x{} @ {}% off", item_name, quantity, custom_discount_pct
     )
 
     try:
@@ -593,13 +539,7 @@ async def calculate_custom_quote(
             return "❌ Custom discount must be between 0% and 100%"
 
         # Buscar preço
-        conn = get_db_connection(ctx.deps.db_path)
-        cursor = conn.cursor()
-
-        query = "SELECT item_name, unit_price FROM inventory WHERE LOWER(item_name) = LOWER(?)"
-        cursor.execute(query, (item_name,))
-        row = cursor.fetchone()
-        conn.close()
+        row = await _lookup_item(ctx.deps.db_path, item_name)
 
         if not row:
             return f"❌ Product '{item_name}' not found."
@@ -632,7 +572,7 @@ Custom Discount ({custom_discount_pct:.1f}%): -${discount_amount:,.2f}
         if custom_discount_pct > standard_discount:
             response += "\n⚠️ Custom discount is higher than standard tier."
 
-        logger.success(f"✅ Custom quote calculated: ${total:,.2f}")
+        logger.success("✅ Custom quote calculated: ${:,.2f}", total)
         return response.strip()
 
     except Exception as e:
@@ -640,6 +580,57 @@ Custom Discount ({custom_discount_pct:.1f}%): -${discount_amount:,.2f}
         return f"Error: {str(e)}"
 
 
+# ============================================================================
+# QUOTING AGENT
+# ============================================================================
+
+# Cache key fixa para o prefixo estático (prompt + tools) - ver orchestrator.py
+_PROMPT_CACHE_SETTINGS = {"extra_body": {"prompt_cache_key": "munder-difflin-quoting"}}
+
+
+@cache
+def get_quoting_agent():
+    """
+    Cria o Quoting Agent no primeiro uso.
+
+    Adiar a criação do agente (e do cliente OpenAI) mantém o import deste módulo
+    barato - as tools e os helpers podem ser usados sem montar o modelo.
+    """
+    # Importar configuração de teste se estivermos em modo de teste
+    if "pytest" in sys.modules:
+        from src.test_config import create_test_agent
+
+        agent = create_test_agent(QUOTING_SYSTEM_PROMPT, QuotingDependencies)
+    else:
+        from pydantic_ai import Agent
+
+        from ._http import openai_model
+
+        agent = Agent(
+            model=openai_model("gpt-4o-mini"),
+            system_prompt=QUOTING_SYSTEM_PROMPT,
+            deps_type=QuotingDependencies,
+            model_settings=_PROMPT_CACHE_SETTINGS,
+        )
+
+    for tool in (
+        get_product_price,
+        generate_quote,
+        search_quote_history,
+        get_quote_by_id,
+        calculate_custom_quote,
+    ):
+        agent.tool(tool)
+    return agent
+
+
+def __getattr__(name: str):
+    """Mantém `quoting_agent` importável como atributo do módulo"""
+    if name == "quoting_agent":
+        return get_quoting_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 # ============================================================================
 # CONVENIENCE FUNCTION
 # ============================================================================
@@ -663,14 +654,15 @@ async def request_quote(
     Returns:
         Generated quote
     """
-    logger.info(f"💬 Quote request: {item_name} x{quantity}")
+    logger.info("💬 Quote request: {} x{}", item_name, quantity)
 
     try:
         query = f"I need a quote for {quantity} units of {item_name}"
 
-        result = await quoting_agent.run(
-            query, deps=QuotingDependencies(db_path=db_path, customer_id=customer_id)
-        )
+        async with llm_slot():
+            result = await get_quoting_agent().run(
+                query, deps=QuotingDependencies(db_path=db_path, customer_id=customer_id)
+            )
 
         return result.output
 
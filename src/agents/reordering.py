@@ -3,32 +3,25 @@ Reordering Agent - Automated stock replenishment system
 Monitors inventory levels and places supplier orders when stock is low
 """
 
+import itertools
 import sqlite3
+import time
 from datetime import datetime, timedelta
 from typing import Any
 
-import pandas as pd
 from loguru import logger
 from pydantic import BaseModel
 from pydantic_ai import Agent, RunContext
 
+from src.db import acquire_reader, acquire_writer, invalidate_item
+
+from ._runtime import llm_slot
+
 # ============================================================================
 # MODELS
 # ============================================================================
 
 
-class ReorderItem(BaseModel):
-    """Item que precisa ser reordenado"""
-
-    item_name: str
-    current_stock: int
-    min_stock_level: int
-    deficit: int  # Quanto falta
-    reorder_quantity: int  # Quanto pedir
-    unit_price: float
-    total_cost: float
-
-
 class SupplierOrder(BaseModel):
     """Ordem de compra ao fornecedor"""
 
@@ -108,8 +101,10 @@ if "pytest" in sys.modules:
 
     reordering_agent = create_test_agent(REORDERING_SYSTEM_PROMPT, ReorderingDependencies)
 else:
+    from ._http import openai_model
+
     reordering_agent = Agent(
-        model="openai:gpt-4o-mini",
+        model=openai_model("gpt-4o-mini"),
         system_prompt=REORDERING_SYSTEM_PROMPT,
         deps_type=ReorderingDependencies,
     )
@@ -120,25 +115,101 @@ else:
 # ============================================================================
 
 
-def get_db_connection(db_path: str) -> sqlite3.Connection:
-    """Cria conexão com o banco de dados"""
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    return conn
+# Sufixo sequencial: ordens do mesmo lote (mesmo instante) não colidem
+_order_counter = itertools.count()
 
 
 def generate_order_id() -> str:
     """Gera ID único para ordem de compra"""
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    return f"PO{timestamp}"
+    return f"PO{time.time_ns():x}{next(_order_counter):x}"
 
 
-def calculate_delivery_date(days: int = 6) -> str:
-    """Calcula data estimada de entrega"""
-    delivery = datetime.now() + timedelta(days=days)
+def calculate_delivery_date(days: int = 6, now: datetime | None = None) -> str:
+    """Calcula data estimada de entrega (a partir de now, se informado)"""
+    delivery = (now or datetime.now()) + timedelta(days=days)
     return delivery.strftime("%Y-%m-%d")
 
 
+_INSERT_STOCK_ORDER = """
+    INSERT INTO transactions (
+        id, transaction_type, item_name,
+        units, price, transaction_date
+    ) VALUES (?, 'stock_orders', ?, ?, ?, ?)
+"""
+_UPDATE_STOCK = "UPDATE inventory SET current_stock = ? WHERE item_name = ?"
+
+# Bloco de um item no relatório de estoque baixo
+_LOW_STOCK_FMT = (
+    "📦 **{item_name}**\n"
+    "   • Current: {current_stock} units (Minimum: {min_stock_level})\n"
+    "   • Deficit: {deficit} units\n"
+    "   • Recommended Order: {reorder_quantity} units\n"
+    "   • Cost: ${total_cost:,.2f}\n"
+)
+_SELECT_ITEM = (
+    "SELECT item_name, unit_price, current_stock FROM inventory WHERE item_name = ? COLLATE NOCASE"
+)
+
+
+def _apply_supplier_orders(cursor: sqlite3.Cursor, orders: list[dict], created_at: str) -> None:
+    """
+    Registra as ordens de compra e atualiza o estoque em lote (sem commit).
+
+    Args:
+        cursor: Cursor da transação em andamento
+        orders: Dicts com order_id, item_name, quantity, total_cost e new_stock
+        created_at: Data/hora da transação
+    """
+    cursor.executemany(
+        _INSERT_STOCK_ORDER,
+        [
+            (o["order_id"], o["item_name"], o["quantity"], o["total_cost"], created_at)
+            for o in orders
+        ],
+    )
+    # Em produção real, isso seria feito após a entrega
+    cursor.executemany(_UPDATE_STOCK, [(o["new_stock"], o["item_name"]) for o in orders])
+
+
+def _place_batch(
+    cursor: sqlite3.Cursor, items: list[tuple[str, int]], now: datetime | None = None
+) -> list[dict]:
+    """
+    Monta e grava as ordens de compra de um lote (dentro da transação do chamador).
+
+    Args:
+        cursor: Cursor da transação em andamento (BEGIN IMMEDIATE)
+        items: Pares (item_name, quantity); produtos desconhecidos são ignorados
+        now: Instante do lote (um único datetime.now() para todas as ordens)
+
+    Returns:
+        Dicts das ordens gravadas (ver _apply_supplier_orders) com unit_price
+    """
+    orders = []
+    stock: dict[str, int] = {}  # Estoque já ajustado dentro do lote (itens repetidos)
+    for item_name, quantity in items:
+        row = cursor.execute(_SELECT_ITEM, (item_name,)).fetchone()
+        if row is None:
+            logger.warning(f"⚠️ Product not found, skipping: {item_name}")
+            continue
+
+        actual_name = row["item_name"]
+        stock[actual_name] = stock.get(actual_name, row["current_stock"]) + quantity
+        orders.append(
+            {
+                "order_id": generate_order_id(),
+                "item_name": actual_name,
+                "quantity": quantity,
+                "unit_price": row["unit_price"],
+                "total_cost": row["unit_price"] * quantity,
+                "new_stock": stock[actual_name],
+            }
+        )
+
+    _apply_supplier_orders(cursor, orders, f"{now or datetime.now():%Y-%m-%d %H:%M:%S}")
+    return orders
+
+
 # ============================================================================
 # TOOL 1: Check Low Stock Items
 # ============================================================================
@@ -155,8 +226,6 @@ async def check_low_stock_items(ctx: RunContext[ReorderingDependencies]) -> str:
     logger.info("🔍 Checking for low stock items...")
 
     try:
-        conn = get_db_connection(ctx.deps.db_path)
-
         query = """
             SELECT 
                 item_name,
@@ -168,20 +237,20 @@ async def check_low_stock_items(ctx: RunContext[ReorderingDependencies]) -> str:
             ORDER BY (min_stock_level - current_stock) DESC
         """
 
-        df = pd.read_sql_query(query, conn)
-        conn.close()
+        async with acquire_reader(ctx.deps.db_path) as conn:
+            rows = conn.execute(query).fetchall()
 
-        if df.empty:
+        if not rows:
             logger.success("✅ All items adequately stocked")
             return (
                 "✅ All inventory items are at or above minimum stock levels. No reordering needed."
             )
 
-        # Calcular reorder quantities
-        reorder_items = []
+        # Calcular reorder quantities e montar o bloco de cada item direto da linha
+        blocks = []
         total_cost = 0.0
 
-        for _, row in df.iterrows():
+        for row in rows:
             deficit = row["min_stock_level"] - row["current_stock"]
             # Reorder para 50% acima do mínimo
             reorder_qty = int(
@@ -190,34 +259,25 @@ async def check_low_stock_items(ctx: RunContext[ReorderingDependencies]) -> str:
             item_cost = reorder_qty * row["unit_price"]
             total_cost += item_cost
 
-            reorder_items.append(
-                ReorderItem(
+            blocks.append(
+                _LOW_STOCK_FMT.format(
                     item_name=row["item_name"],
                     current_stock=row["current_stock"],
                     min_stock_level=row["min_stock_level"],
                     deficit=deficit,
                     reorder_quantity=reorder_qty,
-                    unit_price=row["unit_price"],
                     total_cost=item_cost,
                 )
             )
 
-        # Formatar relatório
-        lines = [f"⚠️ **{len(reorder_items)} Product(s) Need Reordering**\n"]
-
-        for item in reorder_items:
-            lines.append(
-                f"📦 **{item.item_name}**\n"
-                f"   • Current: {item.current_stock} units (Minimum: {item.min_stock_level})\n"
-                f"   • Deficit: {item.deficit} units\n"
-                f"   • Recommended Order: {item.reorder_quantity} units\n"
-                f"   • Cost: ${item.total_cost:,.2f}\n"
+        logger.warning(f"⚠️ {len(blocks)} items need reordering (${total_cost:,.2f})")
+        return "\n".join(
+            (
+                f"⚠️ **{len(blocks)} Product(s) Need Reordering**\n",
+                "\n".join(blocks),
+                f"\n**Total Reorder Cost: ${total_cost:,.2f}**",
             )
-
-        lines.append(f"\n**Total Reorder Cost: ${total_cost:,.2f}**")
-
-        logger.warning(f"⚠️ {len(reorder_items)} items need reordering (${total_cost:,.2f})")
-        return "\n".join(lines)
+        )
 
     except Exception as e:
         logger.error(f"❌ Error checking low stock: {e}")
@@ -247,61 +307,52 @@ async def place_supplier_order(
     """
     logger.info(f"📦 Placing supplier order: {item_name} x{quantity}")
 
-    conn = None
     try:
-        conn = get_db_connection(ctx.deps.db_path)
-        cursor = conn.cursor()
-
-        # 1. Validar produto
-        cursor.execute(
-            "SELECT item_name, unit_price, current_stock FROM inventory WHERE LOWER(item_name) = LOWER(?)",
-            (item_name,),
-        )
-        row = cursor.fetchone()
-
-        if not row:
-            conn.close()
-            return f"❌ Product '{item_name}' not found."
-
-        actual_name = row["item_name"]
-        unit_price = row["unit_price"]
-        current_stock = row["current_stock"]
-        total_cost = unit_price * quantity
-
-        # 2. Criar ordem de compra
-        order_id = generate_order_id()
-        delivery_date = calculate_delivery_date()
-        created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        # 3. Registrar transação
-        cursor.execute(
-            """
-            INSERT INTO transactions (
-                id, transaction_type, item_name,
-                units, price, transaction_date
-            ) VALUES (?, ?, ?, ?, ?, ?)
-        """,
-            (
-                order_id,
-                "stock_orders",
-                actual_name,
-                quantity,
-                total_cost,
+        # Conexão de escrita única do pool; o lock serializa os escritores
+        async with acquire_writer(ctx.deps.db_path) as conn:
+            cursor = conn.cursor()
+
+            # Lock de escrita antes da leitura: sem lost update entre pedidos concorrentes
+            cursor.execute("BEGIN IMMEDIATE")
+
+            # 1. Validar produto
+            row = cursor.execute(_SELECT_ITEM, (item_name,)).fetchone()
+
+            if not row:
+                return f"❌ Product '{item_name}' not found."
+
+            actual_name = row["item_name"]
+            unit_price = row["unit_price"]
+            current_stock = row["current_stock"]
+            total_cost = unit_price * quantity
+
+            # 2. Criar ordem de compra
+            now = datetime.now()
+            order_id = generate_order_id()
+            delivery_date = calculate_delivery_date(now=now)
+            created_at = f"{now:%Y-%m-%d %H:%M:%S}"
+
+            # 3. Registrar transação e atualizar inventário (simular entrega imediata)
+            new_stock = current_stock + quantity
+            _apply_supplier_orders(
+                cursor,
+                [
+                    {
+                        "order_id": order_id,
+                        "item_name": actual_name,
+                        "quantity": quantity,
+                        "total_cost": total_cost,
+                        "new_stock": new_stock,
+                    }
+                ],
                 created_at,
-            ),
-        )
+            )
 
-        # 4. Atualizar inventário (simular entrega imediata)
-        # Em produção real, isso seria feito após a entrega
-        new_stock = current_stock + quantity
-        cursor.execute(
-            "UPDATE inventory SET current_stock = ? WHERE item_name = ?", (new_stock, actual_name)
-        )
+            conn.commit()
 
-        conn.commit()
-        conn.close()
+        invalidate_item(ctx.deps.db_path, actual_name)
 
-        # 5. Criar resposta
+        # 4. Criar resposta
         order = SupplierOrder(
             order_id=order_id,
             item_name=actual_name,
@@ -331,9 +382,7 @@ For simulation purposes, inventory is updated immediately.
         return response.strip()
 
     except Exception as e:
-        if conn:
-            conn.rollback()
-            conn.close()
+        # acquire_writer desfaz a transação aberta ao sair
         logger.error(f"❌ Error placing order: {e}")
         return f"Error placing supplier order: {str(e)}"
 
@@ -355,61 +404,55 @@ async def auto_reorder_all_low_stock(ctx: RunContext[ReorderingDependencies]) ->
     logger.info("🤖 Starting automatic reordering process...")
 
     try:
-        conn = get_db_connection(ctx.deps.db_path)
-
         # Buscar todos os items baixos
         query = """
             SELECT 
                 item_name,
                 current_stock,
-                min_stock_level,
-                unit_price
+                min_stock_level
             FROM inventory
             WHERE current_stock < min_stock_level
         """
 
-        df = pd.read_sql_query(query, conn)
-        conn.close()
+        async with acquire_reader(ctx.deps.db_path) as conn:
+            rows = conn.execute(query).fetchall()
 
-        if df.empty:
+        if not rows:
             return "✅ No reordering needed. All inventory levels are adequate."
 
-        # Processar cada item
-        orders_placed = []
-        total_cost = 0.0
-
-        for _, row in df.iterrows():
-            reorder_qty = int(
-                (row["min_stock_level"] * ctx.deps.safety_stock_multiplier) - row["current_stock"]
-            )
-
-            # Chamar place_supplier_order para cada item
-            await place_supplier_order(ctx, item_name=row["item_name"], quantity=reorder_qty)
-
-            item_cost = reorder_qty * row["unit_price"]
-            total_cost += item_cost
-
-            orders_placed.append(
-                {"product": row["item_name"], "quantity": reorder_qty, "cost": item_cost}
+        # Todas as ordens em um único lote (uma transação no writer)
+        items = [
+            (
+                row["item_name"],
+                int(
+                    (row["min_stock_level"] * ctx.deps.safety_stock_multiplier)
+                    - row["current_stock"]
+                ),
             )
+            for row in rows
+        ]
+        orders = await run_batch_async(items, ctx.deps.db_path)
 
-            logger.info(f"✅ Reordered: {row['item_name']} x{reorder_qty}")
+        total_cost = 0.0
+        for order in orders:
+            total_cost += order.total_cost
+            logger.info(f"✅ Reordered: {order.item_name} x{order.quantity}")
 
         # Resumo
         summary = [
             "🤖 **Automatic Reordering Complete**\n",
-            f"Orders Placed: {len(orders_placed)}\n",
+            f"Orders Placed: {len(orders)}\n",
         ]
 
-        for order in orders_placed:
+        for order in orders:
             summary.append(
-                f"✅ {order['product']}: {order['quantity']:,} units (${order['cost']:,.2f})"
+                f"✅ {order.item_name}: {order.quantity:,} units (${order.total_cost:,.2f})"
             )
 
         summary.append(f"\n**Total Investment: ${total_cost:,.2f}**")
         summary.append("\n✅ All inventory levels restored to safety stock.")
 
-        logger.success(f"🤖 Auto-reorder complete: {len(orders_placed)} orders, ${total_cost:,.2f}")
+        logger.success(f"🤖 Auto-reorder complete: {len(orders)} orders, ${total_cost:,.2f}")
         return "\n".join(summary)
 
     except Exception as e:
@@ -433,8 +476,6 @@ async def get_supplier_delivery_schedule(ctx: RunContext[ReorderingDependencies]
     logger.info("📅 Fetching supplier delivery schedule...")
 
     try:
-        conn = get_db_connection(ctx.deps.db_path)
-
         query = """
             SELECT 
                 id as order_id,
@@ -449,15 +490,15 @@ async def get_supplier_delivery_schedule(ctx: RunContext[ReorderingDependencies]
             LIMIT 20
         """
 
-        df = pd.read_sql_query(query, conn)
-        conn.close()
+        async with acquire_reader(ctx.deps.db_path) as conn:
+            rows = conn.execute(query).fetchall()
 
-        if df.empty:
+        if not rows:
             return "📅 No supplier orders found."
 
-        lines = [f"📅 **Supplier Order History** (last {len(df)} orders):\n"]
+        lines = [f"📅 **Supplier Order History** (last {len(rows)} orders):\n"]
 
-        for _, row in df.iterrows():
+        for row in rows:
             status_emoji = "✅" if row["status"] == "completed" else "⏳"
 
             lines.append(
@@ -476,6 +517,57 @@ async def get_supplier_delivery_schedule(ctx: RunContext[ReorderingDependencies]
         return f"Error retrieving delivery schedule: {str(e)}"
 
 
+# ============================================================================
+# BATCH API - Várias ordens de compra numa única transação
+# ============================================================================
+
+
+async def run_batch_async(
+    items: list[tuple[str, int]], db_path: str = "munder_difflin.db"
+) -> list[SupplierOrder]:
+    """
+    Place several supplier orders at once.
+    All orders are written in one transaction on the writer connection.
+
+    Args:
+        items: (item_name, quantity) pairs
+        db_path: Database path
+
+    Returns:
+        The orders placed (unknown products are skipped with a warning)
+    """
+    if not items:
+        return []
+
+    logger.info(f"📦 Placing {len(items)} supplier orders in one batch...")
+
+    async with acquire_writer(db_path) as conn:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+
+        now = datetime.now()
+        orders = _place_batch(cursor, items, now)
+        conn.commit()
+
+    for name in {o["item_name"] for o in orders}:
+        invalidate_item(db_path, name)
+
+    delivery_date = calculate_delivery_date(now=now)
+    logger.success(f"✅ Batch placed: {len(orders)} supplier orders")
+    return [
+        SupplierOrder(
+            order_id=o["order_id"],
+            item_name=o["item_name"],
+            quantity=o["quantity"],
+            unit_price=o["unit_price"],
+            total_cost=o["total_cost"],
+            expected_delivery=delivery_date,
+            status="completed",
+        )
+        for o in orders
+    ]
+
+
 # ============================================================================
 # CONVENIENCE FUNCTION - Trigger Reorder Check
 # ============================================================================
@@ -500,16 +592,18 @@ async def trigger_reorder_check(
     try:
         if auto_approve:
             # Auto-reorder tudo
-            result = await reordering_agent.run(
-                "Check low stock and automatically reorder all items below minimum",
-                deps=ReorderingDependencies(db_path=db_path, auto_approve=True),
-            )
+            async with llm_slot():
+                result = await reordering_agent.run(
+                    "Check low stock and automatically reorder all items below minimum",
+                    deps=ReorderingDependencies(db_path=db_path, auto_approve=True),
+                )
         else:
             # Apenas reportar
-            result = await reordering_agent.run(
-                "Check which items are low on stock and need reordering",
-                deps=ReorderingDependencies(db_path=db_path, auto_approve=False),
-            )
+            async with llm_slot():
+                result = await reordering_agent.run(
+                    "Check which items are low on stock and need reordering",
+                    deps=ReorderingDependencies(db_path=db_path, auto_approve=False),
+                )
 
         return result.output
 
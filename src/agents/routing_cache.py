@@ -0,0 +1,96 @@
+"""
+Routing Cache - Reuses the Orchestrator's routing decisions for similar requests
+Embeds each request and looks up the nearest past decision, so near-duplicate
+requests skip the routing LLM call. Requires the optional sentence-transformers
+package; without it the cache is simply disabled.
+"""
+
+import asyncio
+import threading
+from functools import cache
+
+import numpy as np
+from loguru import logger
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+SIMILARITY_THRESHOLD = 0.92
+MAX_ENTRIES = 4096
+
+
+@cache
+def _get_encoder():
+    """Load the embedding model once (None when sentence-transformers is missing)"""
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:  # sentence-transformers is optional
+        logger.info("ℹ️ sentence-transformers not installed - routing cache disabled")
+        return None
+    return SentenceTransformer(EMBEDDING_MODEL)
+
+
+# ============================================================================
+# ROUTING CACHE
+# ============================================================================
+
+
+class RoutingCache:
+    """Nearest-neighbour store of (request embedding -> agent name) decisions"""
+
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD, max_entries: int = MAX_ENTRIES):
+        self.threshold = threshold
+        self.max_entries = max(1, max_entries)
+        self._embeddings: np.ndarray | None = None  # (n, dim), L2-normalized rows
+        self._routes: list[str] = []
+        self._lock = threading.Lock()
+
+    def _embed(self, text: str) -> np.ndarray | None:
+        encoder = _get_encoder()
+        if encoder is None:
+            return None
+        return encoder.encode(text, normalize_embeddings=True).astype(np.float32)
+
+    def lookup(self, text: str) -> str | None:
+        """Agent name of the most similar past request, if similar enough"""
+        if not self._routes:
+            return None
+        vector = self._embed(text)
+        if vector is None:
+            return None
+        with self._lock:
+            # Rows are normalized, so the dot product is the cosine similarity
+            similarities = self._embeddings @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] <= self.threshold:
+                return None
+            return self._routes[best]
+
+    def remember(self, text: str, route: str) -> None:
+        """Store the routing decision taken for this request"""
+        vector = self._embed(text)
+        if vector is None:
+            return
+        with self._lock:
+            if self._embeddings is None:
+                self._embeddings = vector[np.newaxis, :]
+            else:
+                self._embeddings = np.vstack((self._embeddings, vector))
+            self._routes.append(route)
+            # Oldest decisions are dropped once the cache is full
+            if len(self._routes) > self.max_entries:
+                self._embeddings = self._embeddings[-self.max_entries :]
+                self._routes = self._routes[-self.max_entries :]
+
+    async def alookup(self, text: str) -> str | None:
+        """lookup() off the event loop (embedding is CPU-bound)"""
+        return await asyncio.to_thread(self.lookup, text)
+
+    async def aremember(self, text: str, route: str) -> None:
+        """remember() off the event loop"""
+        await asyncio.to_thread(self.remember, text, route)
+
+
+routing_cache = RoutingCache()
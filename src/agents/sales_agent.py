@@ -3,7 +3,8 @@ Sales Agent - Processes purchase orders, creates transactions, and manages sales
 Coordinates with Inventory and Quoting agents to fulfill customer orders
 """
 
-import sqlite3
+import itertools
+import time
 from datetime import datetime
 from typing import Any, Literal
 
@@ -12,6 +13,10 @@ from loguru import logger
 from pydantic import BaseModel, Field
 from pydantic_ai import Agent, RunContext
 
+from src.db import acquire_reader, acquire_writer, invalidate_item
+
+from ._runtime import llm_slot
+
 # ============================================================================
 # MODELS - Estruturas de dados
 # ============================================================================
@@ -124,8 +129,10 @@ if "pytest" in sys.modules:
 
     sales_agent = create_test_agent(SALES_SYSTEM_PROMPT, SalesDependencies)
 else:
+    from ._http import openai_model
+
     sales_agent = Agent(
-        model="openai:gpt-4o-mini",
+        model=openai_model("gpt-4o-mini"),
         system_prompt=SALES_SYSTEM_PROMPT,
         deps_type=SalesDependencies,
     )
@@ -136,18 +143,14 @@ else:
 # ============================================================================
 
 
-def get_db_connection(db_path: str) -> sqlite3.Connection:
-    """Cria conexão com o banco de dados"""
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    return conn
+# Sufixo sequencial: vendas no mesmo instante não colidem
+_id_counter = itertools.count()
 
 
 def generate_id(transaction_type: str) -> str:
     """Gera ID único para transação"""
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
     prefix = "S" if transaction_type == "sales" else "P"
-    return f"{prefix}{timestamp}"
+    return f"{prefix}{time.time_ns():x}{next(_id_counter):x}"
 
 
 # ============================================================================
@@ -179,32 +182,34 @@ async def create_sales_transaction(
     """
     logger.info(f"💰 Processing sales transaction: {item_name} x{quantity} @ ${unit_price}")
 
-    conn = None
     try:
-        conn = get_db_connection(ctx.deps.db_path)
-        cursor = conn.cursor()
+        async with acquire_writer(ctx.deps.db_path) as conn:
+            cursor = conn.cursor()
 
-        # 1. Validar produto e estoque
-        cursor.execute(
-            "SELECT item_name, current_stock, unit_price FROM inventory WHERE LOWER(item_name) = LOWER(?)",
-            (item_name,),
-        )
-        row = cursor.fetchone()
-
-        if not row:
-            conn.close()
-            logger.warning(f"⚠️ Product not found: {item_name}")
-            return f"❌ Product '{item_name}' not found in inventory."
-
-        actual_name = row["item_name"]
-        current_stock = row["current_stock"]
-        catalog_price = row["unit_price"]
-
-        # 2. Verificar disponibilidade
-        if current_stock < quantity:
-            conn.close()
-            logger.warning(f"⚠️ Insufficient stock: {current_stock} < {quantity}")
-            return f"""
+            # Lock de escrita antes da leitura: sem lost update entre pedidos concorrentes
+            cursor.execute("BEGIN IMMEDIATE")
+
+            # 1. Validar produto e estoque
+            cursor.execute(
+                "SELECT item_name, current_stock, unit_price, min_stock_level FROM inventory "
+                "WHERE item_name = ? COLLATE NOCASE",
+                (item_name,),
+            )
+            row = cursor.fetchone()
+
+            if not row:
+                logger.warning(f"⚠️ Product not found: {item_name}")
+                return f"❌ Product '{item_name}' not found in inventory."
+
+            actual_name = row["item_name"]
+            current_stock = row["current_stock"]
+            catalog_price = row["unit_price"]
+            min_stock = row["min_stock_level"]
+
+            # 2. Verificar disponibilidade
+            if current_stock < quantity:
+                logger.warning(f"⚠️ Insufficient stock: {current_stock} < {quantity}")
+                return f"""
 ❌ **Order Cannot Be Fulfilled**
 
 Product: {actual_name}
@@ -219,64 +224,60 @@ Options:
 - Choose a different product
 """
 
-        if current_stock == 0:
-            conn.close()
-            return f"❌ {actual_name} is currently out of stock."
-
-        # 3. Validar preço (warning se diferente do catálogo)
-        price_warning = ""
-        if abs(unit_price - catalog_price) > 0.01:
-            price_diff_pct = ((unit_price - catalog_price) / catalog_price) * 100
-            logger.info(f"💰 Price variance: {price_diff_pct:.1f}% (quoted vs catalog)")
-            if unit_price > catalog_price:
-                price_warning = f"\n⚠️ Note: Quoted price (${unit_price:.2f}) is higher than current catalog price (${catalog_price:.2f})"
-
-        # 4. Criar transação
-        id = generate_id("sales")
-        price = unit_price * quantity
-        transaction_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        cursor.execute(
-            """
-            INSERT INTO transactions (
-                id, transaction_type, item_name,
-                units, price, transaction_date
-            ) VALUES (?, ?, ?, ?, ?, ?)
-        """,
-            (
-                id,
-                "sales",
-                actual_name,
-                quantity,
-                price,
-                transaction_date,
-            ),
-        )
-
-        # 5. Atualizar inventário (deduzir estoque)
-        new_stock = current_stock - quantity
-        cursor.execute(
-            "UPDATE inventory SET current_stock = ? WHERE item_name = ?", (new_stock, actual_name)
-        )
-
-        # 6. Atualizar quote se fornecido
-        if quote_id:
-            cursor.execute("UPDATE quotes SET status = 'accepted' WHERE quote_id = ?", (quote_id,))
+            if current_stock == 0:
+                return f"❌ {actual_name} is currently out of stock."
+
+            # 3. Validar preço (warning se diferente do catálogo)
+            price_warning = ""
+            if abs(unit_price - catalog_price) > 0.01:
+                price_diff_pct = ((unit_price - catalog_price) / catalog_price) * 100
+                logger.info(f"💰 Price variance: {price_diff_pct:.1f}% (quoted vs catalog)")
+                if unit_price > catalog_price:
+                    price_warning = f"\n⚠️ Note: Quoted price (${unit_price:.2f}) is higher than current catalog price (${catalog_price:.2f})"
+
+            # 4. Criar transação
+            id = generate_id("sales")
+            price = unit_price * quantity
+            transaction_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+            cursor.execute(
+                """
+                INSERT INTO transactions (
+                    id, transaction_type, item_name,
+                    units, price, transaction_date
+                ) VALUES (?, ?, ?, ?, ?, ?)
+            """,
+                (
+                    id,
+                    "sales",
+                    actual_name,
+                    quantity,
+                    price,
+                    transaction_date,
+                ),
+            )
 
-        conn.commit()
+            # 5. Atualizar inventário (deduzir estoque)
+            new_stock = current_stock - quantity
+            cursor.execute(
+                "UPDATE inventory SET current_stock = ? WHERE item_name = ?",
+                (new_stock, actual_name),
+            )
 
-        # 7. Verificar se precisa reordenar
-        cursor.execute(
-            "SELECT min_stock_level FROM inventory WHERE item_name = ?", (actual_name,)
-        )
-        min_stock = cursor.fetchone()["min_stock_level"]
+            # 6. Atualizar quote se fornecido
+            if quote_id:
+                cursor.execute(
+                    "UPDATE quotes SET status = 'accepted' WHERE quote_id = ?", (quote_id,)
+                )
 
-        reorder_alert = ""
-        if new_stock < min_stock:
-            logger.warning(f"⚠️ Stock below minimum: {new_stock} < {min_stock}")
-            reorder_alert = f"\n\n🔔 **Auto-reordering triggered**: Stock dropped to {new_stock} units (minimum: {min_stock})"
+            conn.commit()
+            invalidate_item(ctx.deps.db_path, actual_name)
 
-        conn.close()
+            # 7. Verificar se precisa reordenar (min_stock lido no SELECT inicial)
+            reorder_alert = ""
+            if new_stock < min_stock:
+                logger.warning(f"⚠️ Stock below minimum: {new_stock} < {min_stock}")
+                reorder_alert = f"\n\n🔔 **Auto-reordering triggered**: Stock dropped to {new_stock} units (minimum: {min_stock})"
 
         # 8. Criar resposta
         transaction = Transaction(
@@ -307,9 +308,7 @@ Thank you for your purchase! Your order will be processed immediately.
         return response.strip()
 
     except Exception as e:
-        if conn:
-            conn.rollback()
-            conn.close()
+        # acquire_writer desfaz a transação aberta ao sair
         logger.error(f"❌ Error creating transaction: {e}")
         return f"❌ Error processing order: {str(e)}"
 
@@ -330,29 +329,26 @@ async def get_cash_balance(ctx: RunContext[SalesDependencies]) -> str:
     logger.info("💰 Calculating cash balance...")
 
     try:
-        conn = get_db_connection(ctx.deps.db_path)
-
-        # Sales (money IN)
-        sales_df = pd.read_sql_query(
-            """
-            SELECT SUM(price) as total_sales
-            FROM transactions
-            WHERE transaction_type = 'sales'
-        """,
-            conn,
-        )
-
-        # Purchases (money OUT)
-        purchases_df = pd.read_sql_query(
-            """
-            SELECT SUM(price) as total_purchases
-            FROM transactions
-            WHERE transaction_type = 'stock_orders'
-        """,
-            conn,
-        )
+        async with acquire_reader(ctx.deps.db_path) as conn:
+            # Sales (money IN)
+            sales_df = pd.read_sql_query(
+                """
+                SELECT SUM(price) as total_sales
+                FROM transactions
+                WHERE transaction_type = 'sales'
+            """,
+                conn,
+            )
 
-        conn.close()
+            # Purchases (money OUT)
+            purchases_df = pd.read_sql_query(
+                """
+                SELECT SUM(price) as total_purchases
+                FROM transactions
+                WHERE transaction_type = 'stock_orders'
+            """,
+                conn,
+            )
 
         total_sales = sales_df["total_sales"].iloc[0] or 0.0
         total_purchases = purchases_df["total_purchases"].iloc[0] or 0.0
@@ -399,8 +395,6 @@ async def generate_financial_report(
     logger.info(f"📊 Generating {period} financial report...")
 
     try:
-        conn = get_db_connection(ctx.deps.db_path)
-
         # Construir filtro de data
         date_filter = ""
         if period == "today":
@@ -420,7 +414,6 @@ async def generate_financial_report(
             WHERE transaction_type = 'sales'
             {date_filter}
         """
-        sales_df = pd.read_sql_query(sales_query, conn)
 
         # Top products
         top_products_query = f"""
@@ -435,7 +428,6 @@ async def generate_financial_report(
             ORDER BY revenue DESC
             LIMIT 5
         """
-        top_df = pd.read_sql_query(top_products_query, conn)
 
         # Purchases
         purchases_query = f"""
@@ -446,9 +438,11 @@ async def generate_financial_report(
             WHERE transaction_type = 'stock_orders'
             {date_filter}
         """
-        purchases_df = pd.read_sql_query(purchases_query, conn)
 
-        conn.close()
+        async with acquire_reader(ctx.deps.db_path) as conn:
+            sales_df = pd.read_sql_query(sales_query, conn)
+            top_df = pd.read_sql_query(top_products_query, conn)
+            purchases_df = pd.read_sql_query(purchases_query, conn)
 
         # Formatar relatório
         num_sales = int(sales_df["num_sales"].iloc[0] or 0)
@@ -524,8 +518,6 @@ async def get_transaction_history(
     logger.info(f"📜 Fetching transaction history (type: {transaction_type})...")
 
     try:
-        conn = get_db_connection(ctx.deps.db_path)
-
         query = """
             SELECT *
             FROM transactions
@@ -544,8 +536,8 @@ async def get_transaction_history(
         query += " ORDER BY transaction_date DESC LIMIT ?"
         params.append(limit)
 
-        df = pd.read_sql_query(query, conn, params=params)
-        conn.close()
+        async with acquire_reader(ctx.deps.db_path) as conn:
+            df = pd.read_sql_query(query, conn, params=params)
 
         if df.empty:
             return "📜 No transactions found."
@@ -609,9 +601,10 @@ async def process_order(
     try:
         query = f"Process order for {quantity} units of {item_name} at ${unit_price} per unit"
 
-        result = await sales_agent.run(
-            query, deps=SalesDependencies(db_path=db_path, customer_id=customer_id)
-        )
+        async with llm_slot():
+            result = await sales_agent.run(
+                query, deps=SalesDependencies(db_path=db_path, customer_id=customer_id)
+            )
 
         return result.output
 
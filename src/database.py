@@ -4,21 +4,36 @@ Contém todas as funções de interação com o banco de dados SQLite.
 """
 
 import ast
+import sqlite3
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 
 import numpy as np
 import pandas as pd
-from sqlalchemy import Engine, create_engine
+from sqlalchemy import Engine, create_engine, event
 from sqlalchemy.sql import text
 
 from src.config import DATA_DIR, BusinessRules, db_config
+from src.db.schema import INDEX_STATEMENTS
 from src.utils.logging_config import logger
 
 # ============================================================================
 # DATABASE ENGINE
 # ============================================================================
 
+
+@event.listens_for(Engine, "connect")
+def _configure_sqlite_connection(dbapi_connection, connection_record):
+    """Aplica PRAGMAs de performance em toda nova conexão SQLite."""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA cache_size=-65536")  # 64 MB
+    cursor.close()
+
+
 db_engine = create_engine(db_config.url)
 logger.info(f"Database engine criado: {db_config.url}")
 
@@ -279,6 +294,12 @@ def init_database(engine: Engine = None, seed: int = None) -> Engine:
         inventory_df.to_sql("inventory", engine, if_exists="replace", index=False)
         logger.debug(f"Tabela 'inventory' carregada: {len(inventory_df)} itens")
 
+        # 5. Índices para as consultas de agregação (to_sql recria as tabelas sem índices)
+        with engine.begin() as conn:
+            for statement in INDEX_STATEMENTS:
+                conn.execute(text(statement))
+        logger.debug("Índices criados")
+
         logger.success("Database inicializado com sucesso!")
         return engine
 
@@ -0,0 +1,19 @@
+"""
+Shared SQLite connections and catalog cache for the Munder Difflin agents
+"""
+
+from .catalog_cache import catalog_version, invalidate_item, lookup_item
+from .pool import ConnectionPool, acquire_reader, acquire_writer, close_pool, get_pool
+from .schema import INDEX_STATEMENTS
+
+__all__ = [
+    "ConnectionPool",
+    "INDEX_STATEMENTS",
+    "catalog_version",
+    "acquire_reader",
+    "acquire_writer",
+    "close_pool",
+    "get_pool",
+    "invalidate_item",
+    "lookup_item",
+]
@@ -0,0 +1,65 @@
+"""
+Catalog Cache - Recently read inventory rows shared by the agents
+A quote followed by a sale in the same turn reads the same product row several
+times; keep it for a few seconds (LRU + TTL) and drop it whenever stock changes.
+"""
+
+import sqlite3
+import time
+from collections import OrderedDict
+
+CACHE_SIZE = 1024
+CACHE_TTL = 5.0  # Seconds
+
+# Constant SQL text so the connection's statement cache is hit on every call
+_SQL_LOOKUP = (
+    "SELECT item_name, unit_price, current_stock, min_stock_level "
+    "FROM inventory WHERE item_name = ? COLLATE NOCASE"
+)
+
+# (db_path, lower-cased name) -> (fetched at, row)
+_rows: OrderedDict[tuple[str, str], tuple[float, sqlite3.Row]] = OrderedDict()
+# db_path -> stock changes seen so far; caches of derived answers compare it
+_versions: dict[str, int] = {}
+
+
+def lookup_item(conn: sqlite3.Connection, db_path: str, item_name: str) -> sqlite3.Row | None:
+    """
+    Catalog row of a product (case-insensitive), reusing recent lookups.
+
+    Args:
+        conn: Connection used on a cache miss (row_factory=sqlite3.Row)
+        db_path: Database the connection belongs to (part of the cache key)
+        item_name: Product name as typed by the customer
+
+    Returns:
+        Row with item_name, unit_price, current_stock and min_stock_level, or None.
+        current_stock may be up to CACHE_TTL old - writers must re-read it.
+    """
+    key = (db_path, item_name.lower())
+    entry = _rows.get(key)
+    if entry is not None and time.monotonic() - entry[0] < CACHE_TTL:
+        _rows.move_to_end(key)
+        return entry[1]
+
+    row = conn.execute(_SQL_LOOKUP, (item_name,)).fetchone()
+    if row is None:
+        _rows.pop(key, None)
+        return None
+
+    _rows[key] = (time.monotonic(), row)
+    _rows.move_to_end(key)
+    if len(_rows) > CACHE_SIZE:
+        _rows.popitem(last=False)
+    return row
+
+
+def invalidate_item(db_path: str, item_name: str) -> None:
+    """Drop the cached row of a product (call after changing its stock)"""
+    _rows.pop((db_path, item_name.lower()), None)
+    _versions[db_path] = _versions.get(db_path, 0) + 1
+
+
+def catalog_version(db_path: str) -> int:
+    """Counter bumped by every invalidate_item on this database"""
+    return _versions.get(db_path, 0)
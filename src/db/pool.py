@@ -0,0 +1,169 @@
+"""
+SQLite Connection Pool - Long-lived connections shared by all the agents
+One writer connection (serialized by an asyncio.Lock) plus a bounded set of
+read-only connections, so tool calls stop re-opening the database (and its
+-wal/-shm files) on every request and WAL keeps a warm page cache.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from .schema import INDEX_STATEMENTS
+
+READER_COUNT = os.cpu_count() or 4
+
+# Applied once, when a connection is opened
+_WRITER_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA foreign_keys=ON",
+)
+# journal_mode is persistent in the file (set by the writer); readers only tune themselves
+_READER_PRAGMAS = (
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+def _connect(database: str, pragmas: tuple[str, ...], uri: bool = False) -> sqlite3.Connection:
+    # Connections outlive a single event loop / thread, hence check_same_thread=False
+    conn = sqlite3.connect(database, uri=uri, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    for pragma in pragmas:
+        conn.execute(pragma)
+    return conn
+
+
+class ConnectionPool:
+    """1 writer + up to `readers` read-only connections for one database file"""
+
+    def __init__(self, db_path: str, readers: int = READER_COUNT):
+        self.db_path = db_path
+        self.readers = readers
+        self._writer: sqlite3.Connection | None = None
+        self._idle: list[sqlite3.Connection] = []  # Readers not checked out
+        self._opened = 0
+        # asyncio primitives belong to one loop; rebuilt when a new loop uses the pool
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue[sqlite3.Connection] | None = None
+        self._write_lock: asyncio.Lock | None = None
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is self._loop:
+            return
+        self._loop = loop
+        self._write_lock = asyncio.Lock()
+        self._drain_queue()
+        self._queue = asyncio.Queue()
+        for conn in self._idle:
+            self._queue.put_nowait(conn)
+        self._idle.clear()
+
+    def _drain_queue(self) -> None:
+        # Readers returned under a previous loop are still sitting in its queue
+        if self._queue is not None:
+            while not self._queue.empty():
+                self._idle.append(self._queue.get_nowait())
+
+    def _get_writer(self) -> sqlite3.Connection:
+        # Opened first: creates the file if needed and switches it to WAL
+        if self._writer is None:
+            self._writer = _connect(self.db_path, _WRITER_PRAGMAS)
+            try:
+                for statement in INDEX_STATEMENTS:
+                    self._writer.execute(statement)
+            except sqlite3.OperationalError:
+                pass  # Tables not created yet; init_database creates the indexes
+        return self._writer
+
+    def _open_reader(self) -> sqlite3.Connection:
+        self._get_writer()
+        self._opened += 1
+        uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+        return _connect(uri, _READER_PRAGMAS, uri=True)
+
+    @asynccontextmanager
+    async def reader(self) -> AsyncIterator[sqlite3.Connection]:
+        """Borrow a read-only connection (waits when all `readers` are busy)"""
+        self._bind_loop()
+        if self._queue.empty() and self._opened < self.readers:
+            conn = self._open_reader()
+        else:
+            conn = await self._queue.get()
+        try:
+            yield conn
+        finally:
+            if self._loop is asyncio.get_running_loop():
+                self._queue.put_nowait(conn)
+            else:
+                self._idle.append(conn)
+
+    @asynccontextmanager
+    async def writer(self) -> AsyncIterator[sqlite3.Connection]:
+        """Exclusive use of the writer connection; callers commit or roll back themselves"""
+        self._bind_loop()
+        async with self._write_lock:
+            conn = self._get_writer()
+            try:
+                yield conn
+            finally:
+                if conn.in_transaction:
+                    conn.rollback()  # Never hand an open transaction to the next writer
+
+    def close(self) -> None:
+        """Close every connection that is not checked out"""
+        self._drain_queue()
+        for conn in self._idle:
+            conn.close()
+        self._opened -= len(self._idle)
+        self._idle.clear()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+# ============================================================================
+# MODULE-LEVEL POOLS (one per database file)
+# ============================================================================
+
+_pools: dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str) -> ConnectionPool:
+    """Pool for this database file (created on first use)"""
+    pool = _pools.get(db_path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.setdefault(db_path, ConnectionPool(db_path))
+    return pool
+
+
+def acquire_reader(db_path: str):
+    """`async with acquire_reader(db_path) as conn:` - pooled read-only connection"""
+    return get_pool(db_path).reader()
+
+
+def acquire_writer(db_path: str):
+    """`async with acquire_writer(db_path) as conn:` - the database's single writer"""
+    return get_pool(db_path).writer()
+
+
+def close_pool(db_path: str | None = None) -> None:
+    """Close the pooled connections of one database (or of all of them)"""
+    with _pools_lock:
+        paths = [db_path] if db_path is not None else list(_pools)
+        for path in paths:
+            pool = _pools.pop(path, None)
+            if pool is not None:
+                pool.close()
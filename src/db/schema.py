@@ -0,0 +1,18 @@
+"""
+Index definitions shared by init_database and the connection pool
+All statements are idempotent, so they can run on every startup.
+"""
+
+INDEX_STATEMENTS = (
+    # Schedule / history lookups: type filter + newest-first walk (SQLite scans it backwards)
+    "CREATE INDEX IF NOT EXISTS idx_tx_type_date "
+    "ON transactions(transaction_type, transaction_date)",
+    "CREATE INDEX IF NOT EXISTS idx_inv_lowstock ON inventory(current_stock, min_stock_level)",
+    # Partial index: the low-stock check only touches rows that are actually low
+    "CREATE INDEX IF NOT EXISTS idx_inv_lowstock_partial ON inventory(item_name) "
+    "WHERE current_stock < min_stock_level",
+    # Case-insensitive product lookups: "item_name = ? COLLATE NOCASE"
+    "CREATE INDEX IF NOT EXISTS idx_inventory_item_nocase ON inventory(item_name COLLATE NOCASE)",
+    # Superseded by idx_inventory_item_nocase; drop it from databases that still have it
+    "DROP INDEX IF EXISTS idx_item_name_lower",
+)
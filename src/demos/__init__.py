@@ -0,0 +1,23 @@
+"""
+Shared demo pipeline for the Munder Difflin advanced feature demos
+"""
+
+from .pipeline import (
+    DEMO_CUSTOMERS,
+    INITIAL_QUOTE,
+    STATIC_RECOMMENDATIONS,
+    AdvancedMultiAgentSystem,
+    CustomerBatch,
+    iter_recommendations,
+    run_pipeline,
+)
+
+__all__ = [
+    "AdvancedMultiAgentSystem",
+    "CustomerBatch",
+    "DEMO_CUSTOMERS",
+    "INITIAL_QUOTE",
+    "STATIC_RECOMMENDATIONS",
+    "iter_recommendations",
+    "run_pipeline",
+]
@@ -0,0 +1,426 @@
+"""
+Demo pipeline shared by the advanced feature demos
+Simulated end-to-end flow: customer analysis -> orchestrator -> inventory -> quoting
+-> negotiation -> sales -> business advisor
+"""
+
+import asyncio
+import time
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any
+
+from src.database import init_database
+from src.utils.terminal_animation import (
+    PacingGate,
+    animation,
+    batch_updates,
+    show_business_insights,
+    show_customer_details,
+    show_negotiation_details,
+    show_processing_summary,
+    start_processing_animation,
+    stop_processing_animation,
+    update_agent_processing,
+    update_processing_step,
+)
+
+# Simulated quote used by the demo pipeline (read-only; copy before mutating)
+INITIAL_QUOTE = MappingProxyType({
+    "request_id": "Q20250124120000",
+    "item_name": "A4 paper, Cardstock",
+    "quantity": 700,
+    "unit_price": 0.12,
+    "discount_percentage": 5.0,
+    "subtotal": 84.00,
+    "discount_amount": 4.20,
+    "total_price": 79.80,
+    "delivery_days": 7,
+    "quote_explanation": "Quote for 500 A4 paper + 200 cardstock with 5% bulk discount"
+})
+
+# Business advisor recommendations (read-only)
+STATIC_RECOMMENDATIONS = tuple(MappingProxyType(rec) for rec in [
+    {
+        'category': 'pricing',
+        'priority': 'high',
+        'title': 'Implement Dynamic Pricing for Premium Customers',
+        'description': 'Adjust pricing based on customer type and order volume',
+        'expected_impact': 'Increase revenue by 15-20%',
+        'implementation_effort': 'medium',
+        'estimated_roi': 25.0,
+        'timeline': '2-3 weeks'
+    },
+    {
+        'category': 'inventory',
+        'priority': 'medium',
+        'title': 'Optimize Stock Levels for High-Demand Items',
+        'description': 'Increase stock for A4 paper and cardstock to reduce stockouts',
+        'expected_impact': 'Reduce stockouts by 40%',
+        'implementation_effort': 'low',
+        'estimated_roi': 12.0,
+        'timeline': '1 week'
+    },
+    {
+        'category': 'operations',
+        'priority': 'high',
+        'title': 'Automate Reordering Process',
+        'description': 'Implement predictive reordering based on sales patterns',
+        'expected_impact': 'Reduce manual work by 60%',
+        'implementation_effort': 'high',
+        'estimated_roi': 35.0,
+        'timeline': '4-6 weeks'
+    }
+])
+
+
+def iter_recommendations() -> Iterator[Mapping[str, Any]]:
+    """Yield business recommendations one at a time"""
+    yield from STATIC_RECOMMENDATIONS
+
+
+@dataclass
+class CustomerBatch:
+    """Demo customers stored column-wise (one list per field)"""
+    ids: list[str]
+    names: list[str]
+    companies: list[str]
+    types: list[str]
+    styles: list[str]
+    requests: list[str]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+DEMO_CUSTOMERS = CustomerBatch(
+    ids=["CUST001", "CUST002", "CUST003"],
+    names=["Sarah Johnson", "Mike Rodriguez", "Lisa Chen"],
+    companies=["TechCorp Solutions", "PrintWorks Inc", "Event Planners Pro"],
+    types=["premium", "bulk", "standard"],
+    styles=["analytical", "aggressive", "cooperative"],
+    requests=[
+        "I need 1000 sheets of premium paper for our annual report. Quality is more important than price.",
+        "I need 5000 sheets of A4 paper. Give me your best price - I'm shopping around.",
+        "I need 200 sheets of colored paper for an event. What can you do for me?"
+    ]
+)
+
+
+class AdvancedMultiAgentSystem:
+    """Advanced Multi-Agent System with new features"""
+
+    # Database bootstrap is shared by every instance and runs once per process
+    _db_init_lock = asyncio.Lock()
+    _db_ready = False
+
+    def __init__(self, db_path: str = "munder_difflin.db", max_concurrent_steps: int = 2):
+        self.db_path = db_path
+        self.animation_running = False
+        self._gate = PacingGate(animation)
+        self._step_semaphore = asyncio.Semaphore(max_concurrent_steps)
+
+    async def process_customer_request_advanced(
+        self,
+        customer_request: str,
+        customer_id: str = "CUST001",
+        show_animation: bool = True
+    ) -> dict[str, Any]:
+        """
+        Process customer request with advanced features:
+        - Customer Agent negotiation
+        - Terminal animation
+        - Business Advisor analysis
+        """
+        t0 = time.perf_counter()
+        ctx: dict[str, Any] = {
+            "customer_request": customer_request,
+            "customer_id": customer_id,
+            "step_times": {}
+        }
+
+        if show_animation:
+            self._start_animation()
+
+        try:
+            # Initialize database (first request only)
+            await self._ensure_database()
+
+            await self._run_steps(ctx)
+
+            # Final Summary
+            final_results = self._create_final_summary(
+                ctx["customer_negotiation"], ctx["sales_processing"], ctx["business_analysis"],
+                t0, ctx["step_times"]
+            )
+
+            if show_animation:
+                show_processing_summary(final_results)
+
+            return final_results
+
+        except Exception as e:
+            print(f"❌ Error in advanced processing: {e}")
+            if show_animation:
+                update_agent_processing("orchestrator", "error", f"Error: {str(e)}")
+            return {"error": str(e)}
+
+        finally:
+            if show_animation:
+                await asyncio.sleep(3)
+                stop_processing_animation()
+
+    def _pipeline(self):
+        """
+        Pipeline definition: stages run in order, steps within a stage run concurrently.
+        Each step is (name, step method, args from ctx, background). Background steps
+        are only awaited at the end of the pipeline; results are stored in ctx[name].
+        """
+        return (
+            # Step 1: Customer Analysis
+            (("customer_analysis", self._step_customer_analysis,
+              lambda ctx: (ctx["customer_id"], ctx["customer_request"]), False),),
+            # Steps 2 & 3: Orchestrator analysis and inventory check are independent
+            (("orchestrator_processing", self._step_orchestrator_processing,
+              lambda ctx: (ctx["customer_request"],), False),
+             ("inventory_check", self._step_inventory_check,
+              lambda ctx: (), False)),
+            # Step 4: Quote Generation
+            (("quote_generation", self._step_quote_generation,
+              lambda ctx: (ctx["customer_request"], ctx["customer_id"]), False),),
+            # Step 7: Business Analysis doesn't depend on the deal - overlap it
+            # with negotiation and sales
+            (("business_analysis", self._step_business_analysis,
+              lambda ctx: (), True),),
+            # Step 5: Customer Negotiation
+            (("customer_negotiation", self._step_customer_negotiation,
+              lambda ctx: (ctx["customer_id"], ctx["customer_request"], ctx["quote_generation"]), False),),
+            # Step 6: Sales Processing
+            (("sales_processing", self._step_sales_processing,
+              lambda ctx: (ctx["customer_negotiation"],), False),),
+        )
+
+    async def _run_steps(self, ctx: dict[str, Any]):
+        """Run the pipeline stages, timing every step into ctx['step_times']"""
+        step_times = ctx["step_times"]
+        background: dict[str, asyncio.Task] = {}
+        try:
+            for stage in self._pipeline():
+                foreground = []
+                for name, step, args, in_background in stage:
+                    coro = self._timed(step_times, name, step(*args(ctx)))
+                    if in_background:
+                        background[name] = asyncio.create_task(self._bounded(coro))
+                    elif len(stage) > 1:
+                        foreground.append((name, self._bounded(coro)))
+                    else:
+                        foreground.append((name, coro))
+
+                if len(foreground) == 1:
+                    name, coro = foreground[0]
+                    ctx[name] = await coro
+                elif foreground:
+                    results = await asyncio.gather(*(coro for _, coro in foreground))
+                    ctx.update(zip((name for name, _ in foreground), results, strict=True))
+
+            for name, task in background.items():
+                ctx[name] = await task
+        finally:
+            for task in background.values():
+                if not task.done():
+                    task.cancel()
+
+    async def _ensure_database(self):
+        """Initialize the database once, off the event loop thread"""
+        async with AdvancedMultiAgentSystem._db_init_lock:
+            if not AdvancedMultiAgentSystem._db_ready:
+                await asyncio.to_thread(init_database)
+                AdvancedMultiAgentSystem._db_ready = True
+
+    async def _timed(self, step_times: dict[str, float], name: str, step):
+        """Await a step coroutine and record its wall-clock duration"""
+        start = time.perf_counter()
+        try:
+            return await step
+        finally:
+            step_times[name] = time.perf_counter() - start
+
+    async def _bounded(self, step):
+        """Run a step coroutine while holding the concurrency semaphore"""
+        async with self._step_semaphore:
+            return await step
+
+    def _start_animation(self):
+        """Start the terminal animation"""
+        start_processing_animation()
+        self.animation_running = True
+
+    async def _step_customer_analysis(self, customer_id: str, customer_request: str):
+        """Step 1: Analyze customer profile"""
+        with batch_updates():
+            update_processing_step("Analyzing customer profile", 1)
+            update_agent_processing("customer", "processing", "Loading customer data")
+
+        # Show customer details
+        show_customer_details(f"Customer {customer_id}", customer_request)
+
+        await self._gate.wait_frame()
+        update_agent_processing("customer", "completed", "Profile analyzed")
+
+    async def _step_orchestrator_processing(self, customer_request: str):
+        """Step 2: Orchestrator processes the request"""
+        with batch_updates():
+            update_processing_step("Processing customer request", 2)
+            update_agent_processing("orchestrator", "processing", "Analyzing request")
+
+        # Simulate orchestrator processing
+        await self._gate.wait_frame()
+        update_agent_processing("orchestrator", "completed", "Request analyzed")
+
+    async def _step_inventory_check(self):
+        """Step 3: Check inventory availability"""
+        with batch_updates():
+            update_processing_step("Checking inventory availability", 3)
+            update_agent_processing("inventory", "processing", "Verifying stock levels")
+
+        # Simulate inventory check
+        await self._gate.wait_frame()
+        update_agent_processing("inventory", "completed", "Stock levels verified")
+
+    async def _step_quote_generation(self, customer_request: str, customer_id: str):
+        """Step 4: Generate quote"""
+        with batch_updates():
+            update_processing_step("Generating quote with discounts", 4)
+            update_agent_processing("quoting", "processing", "Calculating pricing")
+
+        # Simulate quote generation
+        quote_result = dict(INITIAL_QUOTE)
+
+        await self._gate.wait_frame()
+        update_agent_processing("quoting", "completed", "Quote generated")
+
+        return quote_result
+
+    async def _step_customer_negotiation(
+        self,
+        customer_id: str,
+        customer_request: str,
+        initial_quote: dict[str, Any]
+    ):
+        """Step 5: Customer negotiation"""
+        with batch_updates():
+            update_processing_step("Customer negotiation in progress", 5)
+            update_agent_processing("customer", "processing", "Negotiating terms")
+
+        # Show initial quote
+        show_negotiation_details(1, initial_quote)
+
+        # Simulate negotiation
+        await self._gate.wait_frame()
+
+        # Customer negotiation result
+        negotiation_result = {
+            'negotiation_successful': True,
+            'customer_profile': {
+                'customer_id': customer_id,
+                'name': 'Sarah Johnson',
+                'customer_type': 'premium',
+                'negotiation_style': 'analytical'
+            },
+            'initial_evaluation': {
+                'strategy': 'minor_negotiation',
+                'satisfaction_score': 0.75
+            },
+            'counter_offer': {
+                'total_price': 75.50,
+                'discount_percentage': 8.0,
+                'delivery_days': 5
+            },
+            'final_deal': {
+                'total_amount': 75.50,
+                'discount_applied': 8.0,
+                'delivery_days': 5,
+                'customer_satisfaction': 0.9
+            },
+            'negotiation_rounds': 2
+        }
+
+        # Show counter-offer
+        show_negotiation_details(2, negotiation_result['counter_offer'])
+
+        await self._gate.wait_frame()
+        update_agent_processing("customer", "completed", "Deal finalized")
+
+        return negotiation_result
+
+    async def _step_sales_processing(self, negotiation_result: dict[str, Any]):
+        """Step 6: Process sales transaction"""
+        with batch_updates():
+            update_processing_step("Processing sales transaction", 6)
+            update_agent_processing("sales", "processing", "Completing sale")
+
+        # Simulate sales processing
+        await self._gate.wait_frame()
+        update_agent_processing("sales", "completed", "Transaction completed")
+
+        return {
+            'transaction_completed': True,
+            'items_sold': 700,
+            'total_amount': negotiation_result['final_deal']['total_amount']
+        }
+
+    async def _step_business_analysis(self):
+        """Step 7: Business advisor analysis"""
+        with batch_updates():
+            update_processing_step("Business advisor analysis", 7)
+            update_agent_processing("business_advisor", "processing", "Analyzing performance")
+
+        # Simulate business analysis
+        await self._gate.wait_frame()
+
+        # Business recommendations (streamed to the display)
+        show_business_insights(iter_recommendations())
+
+        await self._gate.wait_frame()
+        update_agent_processing("business_advisor", "completed", "Analysis complete")
+
+        return {
+            'recommendations': STATIC_RECOMMENDATIONS,
+            'total_recommendations': len(STATIC_RECOMMENDATIONS)
+        }
+
+    def _create_final_summary(
+        self,
+        negotiation_result: dict[str, Any],
+        sales_result: dict[str, Any],
+        business_analysis: dict[str, Any],
+        t0: float,
+        step_times: dict[str, float]
+    ) -> dict[str, Any]:
+        """Create final processing summary"""
+        final_deal = negotiation_result.get('final_deal') or {}
+        return {
+            'negotiation_successful': negotiation_result.get('negotiation_successful', False),
+            'final_deal': final_deal,
+            'negotiation_rounds': negotiation_result.get('negotiation_rounds', 0),
+            'transaction_completed': sales_result.get('transaction_completed', False),
+            'items_sold': sales_result.get('items_sold', 0),
+            'total_amount': sales_result.get('total_amount', 0),
+            'business_recommendations': business_analysis.get('total_recommendations', 0),
+            'processing_time': time.perf_counter() - t0,
+            'step_times': step_times,
+            'customer_satisfaction': final_deal.get('customer_satisfaction', 0.0)
+        }
+
+
+async def run_pipeline(
+    customer_request: str,
+    customer_id: str = "CUST001",
+    show_animation: bool = True
+) -> dict[str, Any]:
+    """Run one customer request through the demo pipeline"""
+    system = AdvancedMultiAgentSystem()
+    return await system.process_customer_request_advanced(
+        customer_request, customer_id, show_animation
+    )
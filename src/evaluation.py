@@ -4,7 +4,6 @@ Generates test_results.csv and comprehensive evaluation report
 """
 
 import asyncio
-import os
 import sys
 from datetime import datetime
 from pathlib import Path
@@ -20,6 +19,7 @@ from agents.quoting_agent import request_quote
 from agents.reordering import trigger_reorder_check
 from agents.sales_agent import process_order
 from database import create_engine, init_database
+from src.db import close_pool
 
 
 class EvaluationResults:
@@ -295,9 +295,11 @@ async def evaluate_system():
     all_compliant = all(compliance.values())
     print(f"\n{'🎉 ALL REQUIREMENTS MET!' if all_compliant else '⚠️  SOME REQUIREMENTS NOT MET'}")
 
-    # Cleanup
-    if os.path.exists(db_path):
-        os.remove(db_path)
+    # Cleanup (close pooled connections first so SQLite drops its WAL files)
+    close_pool(db_path)
+    engine.dispose()
+    for suffix in ("", "-wal", "-shm"):
+        Path(db_path + suffix).unlink(missing_ok=True)
 
     return results
 
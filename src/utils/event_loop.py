@@ -0,0 +1,26 @@
+"""
+Event loop entry point shared by the command-line scripts.
+Uses uvloop when it is installed and falls back to asyncio otherwise.
+"""
+
+import asyncio
+import sys
+from collections.abc import Coroutine
+from typing import Any
+
+
+def run[T](main: Coroutine[Any, Any, T]) -> T:
+    """
+    Run the coroutine to completion, like asyncio.run.
+
+    uvloop is optional: it is not available on Windows, and its wheels lag
+    behind new CPython releases.
+    """
+    if sys.version_info < (3, 14):
+        try:
+            import uvloop
+        except ImportError:
+            pass
+        else:
+            return uvloop.run(main)
+    return asyncio.run(main)
@@ -2,8 +2,12 @@
 Terminal Animation System - Shows real-time processing of customer requests
 """
 
+import asyncio
 import time
 import threading
+from contextlib import contextmanager
+from itertools import islice
+from collections.abc import Callable, Iterable, Mapping
 from typing import Dict, List, Any
 from datetime import datetime
 import sys
@@ -21,6 +25,9 @@ class TerminalAnimation:
         self.current_step = ""
         self.progress = 0
         self.total_steps = 0
+        self._frame_listeners: List[Callable[[], None]] = []
+        self._listeners_lock = threading.Lock()  # Listeners change on the loop, fire on the thread
+        self._render_lock = threading.RLock()
         
     def start_animation(self, total_steps: int = 5):
         """Start the terminal animation"""
@@ -72,39 +79,65 @@ class TerminalAnimation:
         """Alias for update_step for compatibility"""
         self.update_step(step, progress)
             
+    @contextmanager
+    def batch_updates(self):
+        """Hold rendering so a group of status updates shows up in a single frame"""
+        with self._render_lock:
+            yield
+
+    def add_frame_listener(self, listener: Callable[[], None]):
+        """Register a callback invoked (from the animation thread) after each frame"""
+        with self._listeners_lock:
+            self._frame_listeners.append(listener)
+
+    def remove_frame_listener(self, listener: Callable[[], None]):
+        """Unregister a frame callback"""
+        with self._listeners_lock:
+            if listener in self._frame_listeners:
+                self._frame_listeners.remove(listener)
+
+    def _notify_frame(self):
+        """Notify listeners that a frame has been rendered"""
+        with self._listeners_lock:
+            listeners = tuple(self._frame_listeners)
+        for listener in listeners:
+            listener()
+
     def _animate(self):
         """Main animation loop"""
         while self.running:
-            self._draw_frame()
+            with self._render_lock:
+                self._draw_frame()
+            self._notify_frame()
             time.sleep(0.1)
+        # Release anyone still waiting for a frame
+        self._notify_frame()
             
     def _draw_frame(self):
         """Draw the current animation frame"""
-        # Move cursor to top
-        sys.stdout.write('\033[H')
-        sys.stdout.write('\033[2J')
+        # Move cursor to top and clear screen
+        lines = ['\033[H\033[2J🚀 Munder Difflin Multi-Agent System - Live Processing']
         
         # Header
-        print("🚀 Munder Difflin Multi-Agent System - Live Processing")
-        print("=" * 80)
-        print(f"📅 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print()
+        lines.append("=" * 80)
+        lines.append(f"📅 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        lines.append("")
         
         # Progress bar
         progress_bar = self._create_progress_bar()
-        print(f"📊 Progress: {progress_bar} {self.progress}/{self.total_steps}")
-        print()
+        lines.append(f"📊 Progress: {progress_bar} {self.progress}/{self.total_steps}")
+        lines.append("")
         
         # Current step
         if self.current_step:
             char = self.animation_chars[self.current_char]
-            print(f"{char} Current Step: {self.current_step}")
+            lines.append(f"{char} Current Step: {self.current_step}")
             self.current_char = (self.current_char + 1) % len(self.animation_chars)
-        print()
+        lines.append("")
         
         # Agent status
-        print("🤖 Agent Status:")
-        print("-" * 50)
+        lines.append("🤖 Agent Status:")
+        lines.append("-" * 50)
         
         for agent, status_info in self.agent_status.items():
             if isinstance(status_info, dict):
@@ -136,16 +169,18 @@ class TerminalAnimation:
             # Format agent name
             agent_name = agent.replace("_", " ").title()
             
-            # Print status
-            print(f"{color}{emoji} {agent_name:<15} {status.upper():<12} {message} {timestamp}\033[0m")
+            # Add status line
+            lines.append(f"{color}{emoji} {agent_name:<15} {status.upper():<12} {message} {timestamp}\033[0m")
             
-        print()
+        lines.append("")
         
         # Recent activity
-        print("📋 Recent Activity:")
-        print("-" * 50)
-        self._show_recent_activity()
+        lines.append("📋 Recent Activity:")
+        lines.append("-" * 50)
+        lines.extend(self._recent_activity_lines())
         
+        # One write + flush per frame
+        sys.stdout.write("\n".join(lines) + "\n")
         sys.stdout.flush()
         
     def _create_progress_bar(self, width: int = 30) -> str:
@@ -154,8 +189,8 @@ class TerminalAnimation:
         bar = "█" * filled + "░" * (width - filled)
         return f"[{bar}]"
         
-    def _show_recent_activity(self):
-        """Show recent system activity"""
+    def _recent_activity_lines(self) -> List[str]:
+        """Recent system activity lines"""
         activities = [
             "🔍 Analyzing customer request...",
             "📦 Checking inventory levels...",
@@ -168,9 +203,7 @@ class TerminalAnimation:
         
         # Show last few activities based on progress
         start_idx = max(0, self.progress - 3)
-        for i in range(start_idx, min(self.progress + 1, len(activities))):
-            if i < len(activities):
-                print(f"  {activities[i]}")
+        return [f"  {activity}" for activity in activities[start_idx:self.progress + 1]]
                 
     def show_customer_interaction(self, customer_name: str, request: str):
         """Show customer interaction details"""
@@ -186,12 +219,12 @@ class TerminalAnimation:
         print(f"🚚 Delivery: {offer.get('delivery_days', 7)} days")
         print("-" * 50)
         
-    def show_business_recommendations(self, recommendations: List[Dict[str, Any]]):
-        """Show business advisor recommendations"""
+    def show_business_recommendations(self, recommendations: Iterable[Mapping[str, Any]]):
+        """Show business advisor recommendations (consumes the iterable lazily)"""
         print(f"\n💼 Business Advisor Recommendations:")
         print("-" * 50)
         
-        for i, rec in enumerate(recommendations[:3], 1):  # Show top 3
+        for i, rec in enumerate(islice(recommendations, 3), 1):  # Show top 3
             priority_emoji = {
                 "high": "🔴",
                 "medium": "🟡", 
@@ -225,8 +258,41 @@ class TerminalAnimation:
         print("=" * 80)
 
 
+class PacingGate:
+    """Paces async callers on rendered animation frames instead of fixed sleeps"""
+
+    def __init__(self, terminal_animation: TerminalAnimation):
+        self.animation = terminal_animation
+
+    async def wait_frame(self):
+        """Wait until the next frame is drawn; just yields to the loop when not animating"""
+        if not self.animation.running:
+            # sleep(0) is a bare yield - no timer is scheduled
+            await asyncio.sleep(0)
+            return
+
+        loop = asyncio.get_running_loop()
+        frame_rendered = asyncio.Event()
+
+        def _on_frame():
+            try:
+                loop.call_soon_threadsafe(frame_rendered.set)
+            except RuntimeError:
+                pass  # Event loop already closed
+
+        self.animation.add_frame_listener(_on_frame)
+        try:
+            # The animation may have stopped (and sent its last frame) before we registered
+            if not self.animation.running:
+                return
+            await frame_rendered.wait()
+        finally:
+            self.animation.remove_frame_listener(_on_frame)
+
+
 # Global animation instance
 animation = TerminalAnimation()
+pacing_gate = PacingGate(animation)
 
 
 def start_processing_animation():
@@ -234,6 +300,16 @@ def start_processing_animation():
     animation.start_animation(7)  # 7 steps: orchestrator -> inventory -> quoting -> customer -> sales -> reordering -> business_advisor
 
 
+def batch_updates():
+    """Group status updates so the animation renders them together"""
+    return animation.batch_updates()
+
+
+async def wait_for_frame():
+    """Wait for the global animation to render its next frame"""
+    await pacing_gate.wait_frame()
+
+
 def stop_processing_animation():
     """Stop the processing animation"""
     animation.stop_animation()
@@ -259,7 +335,7 @@ def show_negotiation_details(round_num: int, offer: Dict[str, Any]):
     animation.show_negotiation_round(round_num, offer)
 
 
-def show_business_insights(recommendations: List[Dict[str, Any]]):
+def show_business_insights(recommendations: Iterable[Mapping[str, Any]]):
     """Show business advisor insights"""
     animation.show_business_recommendations(recommendations)
 
@@ -11,7 +11,7 @@ import pytest
 
 # Import all agents
 from src.agents.inventory_agent import query_inventory
-from src.agents.orchestrator import handle_customer_request
+from src.agents.orchestrator import classify_intent, handle_customer_request
 from src.agents.quoting_agent import request_quote
 from src.agents.reordering import trigger_reorder_check
 from src.agents.sales_agent import process_order
@@ -262,6 +262,19 @@ class TestOrchestratorAgent:
         # Should coordinate multiple agents
         assert len(response) > 100  # Complex response should be longer
 
+    def test_classify_intent(self):
+        """Test rule-based routing of unambiguous requests"""
+        assert classify_intent("Do you have A4 paper in stock?") == "inventory"
+        assert classify_intent("How much does cardstock cost?") == "quoting"
+        assert classify_intent("I want to place an order for 50 sheets") == "sales"
+        # No keywords, or keywords for more than one agent, fall back to the LLM
+        assert classify_intent("I need 500 sheets of A4 paper") == "ambiguous"
+        assert classify_intent("Check stock and quote 200 sheets of A4") == "ambiguous"
+        # Quote/order keywords without a quantity or product refer to an existing one
+        assert classify_intent("What's the status of my order?") == "ambiguous"
+        assert classify_intent("Is my quote still valid?") == "ambiguous"
+        assert classify_intent("How much does it cost?") == "ambiguous"
+
 
 class TestAgentIntegration:
     """Test suite for agent integration scenarios"""
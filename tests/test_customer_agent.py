@@ -0,0 +1,47 @@
+"""
+Unit Tests for Customer Agent
+Tests quote evaluation from the customer's side (no LLM calls)
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from src.agents.customer_agent import analyze_customer_profile, evaluate_quote
+
+# ============================================================================
+# TEST: evaluate_quote
+# ============================================================================
+
+
+@pytest.mark.asyncio
+async def test_over_budget_quote_needs_major_negotiation():
+    """A price above the maximum budget short-circuits the rest of the evaluation"""
+
+    profile = await analyze_customer_profile(None, "CUST001")  # Budget 5,000 - 15,000
+    evaluation = await evaluate_quote(None, {"total_price": 20000}, profile)
+
+    assert evaluation["strategy"] == "major_negotiation"
+    assert evaluation["price_acceptable"] is False
+    assert evaluation["delivery_acceptable"] is None
+    assert "exceeds our maximum budget" in evaluation["negotiation_points"][0]
+
+    print("✅ Test passed: over-budget quote")
+
+
+@pytest.mark.asyncio
+async def test_in_budget_quote_is_fully_evaluated():
+    """A price within budget also gets its delivery and discount checked"""
+
+    profile = await analyze_customer_profile(None, "CUST001")
+    quote = {"total_price": 10000, "delivery_days": 3, "discount_percentage": 10}
+    evaluation = await evaluate_quote(None, quote, profile)
+
+    assert evaluation["price_acceptable"] is True
+    assert evaluation["delivery_acceptable"] is True
+    assert evaluation["strategy"] != "major_negotiation"
+
+    print("✅ Test passed: in-budget quote")
@@ -0,0 +1,131 @@
+"""
+Unit Tests for src/db - connection pool and catalog cache
+"""
+
+import asyncio
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from src.db import (
+    acquire_reader,
+    acquire_writer,
+    catalog_cache,
+    catalog_version,
+    close_pool,
+    get_pool,
+    invalidate_item,
+    lookup_item,
+)
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Small inventory database, with its pool closed after the test"""
+    path = str(tmp_path / "pool.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE inventory ("
+            "item_name TEXT, unit_price REAL, current_stock INTEGER, min_stock_level INTEGER)"
+        )
+        conn.execute("INSERT INTO inventory VALUES ('A4 paper', 0.05, 100, 50)")
+    yield path
+    close_pool(path)
+
+
+def _set_stock(db_path: str, stock: int) -> None:
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE inventory SET current_stock = ?", (stock,))
+
+
+# ============================================================================
+# TEST: ConnectionPool
+# ============================================================================
+
+
+@pytest.mark.asyncio
+async def test_writer_rolls_back_uncommitted_transaction(db_path):
+    """A writer that leaves a transaction open does not leak it to the next one"""
+    async with acquire_writer(db_path) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("UPDATE inventory SET current_stock = 0")
+
+    async with acquire_writer(db_path) as conn:
+        assert not conn.in_transaction
+        assert conn.execute("SELECT current_stock FROM inventory").fetchone()[0] == 100
+
+    print("✅ Test passed: writer rollback")
+
+
+@pytest.mark.asyncio
+async def test_readers_are_read_only(db_path):
+    """Pooled readers cannot write"""
+    async with acquire_reader(db_path) as conn:
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("UPDATE inventory SET current_stock = 0")
+
+    print("✅ Test passed: read-only readers")
+
+
+def test_pool_rebinds_to_a_new_event_loop(db_path):
+    """The pool keeps working (and reuses its readers) across asyncio.run calls"""
+
+    async def use_pool():
+        async with acquire_reader(db_path) as conn:
+            stock = conn.execute("SELECT current_stock FROM inventory").fetchone()[0]
+        async with acquire_writer(db_path) as conn:
+            conn.execute("UPDATE inventory SET current_stock = current_stock + 1")
+            conn.commit()
+        return stock
+
+    assert asyncio.run(use_pool()) == 100
+    assert asyncio.run(use_pool()) == 101
+    assert get_pool(db_path)._opened == 1
+
+    print("✅ Test passed: new event loop")
+
+
+# ============================================================================
+# TEST: Catalog cache
+# ============================================================================
+
+
+def test_lookup_is_cached_until_invalidated(db_path):
+    """Rows are reused within the TTL; invalidate_item drops them and bumps the version"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    version = catalog_version(db_path)
+
+    assert lookup_item(conn, db_path, "a4 PAPER")["current_stock"] == 100
+    _set_stock(db_path, 7)
+    assert lookup_item(conn, db_path, "A4 paper")["current_stock"] == 100
+
+    invalidate_item(db_path, "A4 Paper")
+    assert catalog_version(db_path) == version + 1
+    assert lookup_item(conn, db_path, "A4 paper")["current_stock"] == 7
+    assert lookup_item(conn, db_path, "Nonexistent") is None
+
+    conn.close()
+    print("✅ Test passed: cache invalidation")
+
+
+def test_lookup_expires_after_ttl(db_path, monkeypatch):
+    """Entries older than CACHE_TTL are read again"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    monkeypatch.setattr(catalog_cache, "CACHE_TTL", 0.0)
+
+    assert lookup_item(conn, db_path, "A4 paper")["current_stock"] == 100
+    _set_stock(db_path, 3)
+    assert lookup_item(conn, db_path, "A4 paper")["current_stock"] == 3
+
+    conn.close()
+    print("✅ Test passed: cache TTL")
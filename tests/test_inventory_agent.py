@@ -10,7 +10,7 @@ import pytest
 
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from src.agents.inventory_agent import inventory_agent, query_inventory
+from src.agents.inventory_agent import _SearchIndex, inventory_agent, query_inventory
 from src.dependencies import InventoryDependencies
 
 # ============================================================================
@@ -175,6 +175,30 @@ async def test_stock_level_contains_numbers(db_path):
     print("✅ Test passed: Stock level includes numbers")
 
 
+# ============================================================================
+# TEST: Product Search Index
+# ============================================================================
+
+
+def test_search_index_matches_substrings():
+    """The trigram index finds the same rows as a case-insensitive substring scan"""
+
+    rows = [
+        {"item_name": "A4 paper"},
+        {"item_name": "Glossy paper"},
+        {"item_name": "Paper plates"},
+        {"item_name": "Envelopes"},
+    ]
+    index = _SearchIndex((0, None), rows)
+
+    assert index.match("PAPER") == (rows[0], rows[1], rows[2])
+    assert index.match("per pl") == (rows[2],)
+    assert index.match("a4") == (rows[0],)  # Shorter than a trigram: plain scan
+    assert index.match("zzz") == ()
+
+    print("✅ Test passed: Search index")
+
+
 # ============================================================================
 # RUN ALL TESTS
 # ============================================================================
@@ -0,0 +1,111 @@
+"""
+Unit Tests for Reordering Agent
+Tests batch supplier orders and automatic reordering against a copy of the database
+"""
+
+import shutil
+import sqlite3
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from src.agents.reordering import (
+    ReorderingDependencies,
+    auto_reorder_all_low_stock,
+    run_batch_async,
+)
+from src.db import close_pool
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Copy of the project database, with two items pushed below minimum stock"""
+    path = str(tmp_path / "reordering.db")
+    shutil.copy("munder_difflin.db", path)
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "UPDATE inventory SET current_stock = 10 "
+            "WHERE item_name IN ('Paper plates', 'Glossy paper')"
+        )
+    yield path
+    close_pool(path)
+
+
+def _stock(db_path: str, item_name: str) -> int:
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(
+            "SELECT current_stock FROM inventory WHERE item_name = ?", (item_name,)
+        ).fetchone()[0]
+
+
+# ============================================================================
+# TEST: run_batch_async
+# ============================================================================
+
+
+@pytest.mark.asyncio
+async def test_run_batch_async_places_orders(db_path):
+    """Known products are ordered in one batch; unknown ones are skipped"""
+
+    orders = await run_batch_async(
+        [("paper PLATES", 100), ("Nonexistent product", 5), ("Glossy paper", 40)], db_path
+    )
+
+    assert [o.item_name for o in orders] == ["Paper plates", "Glossy paper"]
+    assert orders[0].total_cost == pytest.approx(100 * orders[0].unit_price)
+    assert len({o.order_id for o in orders}) == 2
+    assert _stock(db_path, "Paper plates") == 110
+    assert _stock(db_path, "Glossy paper") == 50
+
+    with sqlite3.connect(db_path) as conn:
+        recorded = conn.execute(
+            "SELECT COUNT(*) FROM transactions WHERE id IN (?, ?)",
+            tuple(o.order_id for o in orders),
+        ).fetchone()[0]
+    assert recorded == 2
+
+    print("✅ Test passed: run_batch_async")
+
+
+@pytest.mark.asyncio
+async def test_run_batch_async_empty(db_path):
+    """An empty batch touches nothing"""
+
+    assert await run_batch_async([], db_path) == []
+
+    print("✅ Test passed: empty batch")
+
+
+# ============================================================================
+# TEST: auto_reorder_all_low_stock (goes through run_batch_async)
+# ============================================================================
+
+
+@pytest.mark.asyncio
+async def test_auto_reorder_restores_safety_stock(db_path):
+    """Every low item is reordered up to min_stock_level * safety_stock_multiplier"""
+
+    ctx = SimpleNamespace(deps=ReorderingDependencies(db_path=db_path))
+    response = await auto_reorder_all_low_stock(ctx)
+
+    assert "Orders Placed: 2" in response
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute(
+            "SELECT current_stock, min_stock_level FROM inventory "
+            "WHERE item_name IN ('Paper plates', 'Glossy paper')"
+        ).fetchall()
+    assert all(stock == int(minimum * 1.5) for stock, minimum in rows)
+
+    # Nothing left to reorder on the second pass
+    response = await auto_reorder_all_low_stock(ctx)
+    assert "No reordering needed" in response
+
+    print("✅ Test passed: auto reorder")
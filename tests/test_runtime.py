@@ -0,0 +1,121 @@
+"""
+Unit Tests for the LLM concurrency limiter (src/agents/_runtime.py)
+AIMD back-off, slot hand-off between waiters and re-entrant llm_slot
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from src.agents import _runtime
+from src.agents._runtime import AdaptiveLimiter, llm_slot
+
+
+class RateLimitError(Exception):
+    """Stand-in for openai.RateLimitError / ModelHTTPError"""
+
+    status_code = 429
+
+
+# ============================================================================
+# TEST: AdaptiveLimiter (AIMD)
+# ============================================================================
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_halves_and_release_grows_back():
+    """A 429 halves the limit; each finished run adds one slot back after the cool-down"""
+    limiter = AdaptiveLimiter(8, cooldown=0)
+
+    limiter.on_rate_limit()
+    assert limiter.limit == 4
+    limiter.on_rate_limit()
+    assert limiter.limit == 2
+
+    for expected in (3, 4):
+        await limiter.acquire()
+        limiter.release()
+        assert limiter.limit == expected
+
+    print("✅ Test passed: AIMD shrink and grow")
+
+
+@pytest.mark.asyncio
+async def test_limit_stays_reduced_during_cooldown_and_never_exceeds_ceiling():
+    """No growth while cooling down, and never above the configured ceiling"""
+    limiter = AdaptiveLimiter(4, cooldown=60)
+    limiter.on_rate_limit()
+
+    await limiter.acquire()
+    limiter.release()
+    assert limiter.limit == 2
+
+    full = AdaptiveLimiter(2, cooldown=0)
+    await full.acquire()
+    full.release()
+    assert full.limit == 2
+
+    floor = AdaptiveLimiter(1)
+    floor.on_rate_limit()
+    assert floor.limit == 1
+
+    print("✅ Test passed: cool-down and bounds")
+
+
+@pytest.mark.asyncio
+async def test_waiter_gets_slot_on_release():
+    """A caller over the limit waits until a slot is released"""
+    limiter = AdaptiveLimiter(1)
+    await limiter.acquire()
+
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    limiter.release()
+    await asyncio.wait_for(waiter, timeout=1)
+    assert limiter._in_flight == 1
+
+    print("✅ Test passed: slot hand-off")
+
+
+# ============================================================================
+# TEST: llm_slot
+# ============================================================================
+
+
+@pytest.mark.asyncio
+async def test_llm_slot_is_reentrant(monkeypatch):
+    """A nested run (orchestrator -> specialist) reuses its parent's slot"""
+    limiter = AdaptiveLimiter(1)
+    monkeypatch.setattr(_runtime, "_LLM_SEM", limiter)
+
+    async def nested():
+        async with llm_slot():
+            async with llm_slot():
+                return limiter._in_flight
+
+    assert await asyncio.wait_for(nested(), timeout=1) == 1
+    assert limiter._in_flight == 0
+
+    print("✅ Test passed: re-entrant slot")
+
+
+@pytest.mark.asyncio
+async def test_llm_slot_backs_off_on_rate_limit(monkeypatch):
+    """A 429 raised inside the slot reduces the limit and still frees the slot"""
+    limiter = AdaptiveLimiter(8)
+    monkeypatch.setattr(_runtime, "_LLM_SEM", limiter)
+
+    with pytest.raises(RateLimitError):
+        async with llm_slot():
+            raise RateLimitError()
+
+    assert limiter.limit == 4
+    assert limiter._in_flight == 0
+
+    print("✅ Test passed: back-off on 429")